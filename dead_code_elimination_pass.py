@@ -0,0 +1,40 @@
+from typing import Any
+from numba.core import ir_utils
+from numba.core.compiler_machinery import FunctionPass, register_pass
+
+
+def mark_needs_dce(state: Any) -> None:
+    """Records that a pass left dead code behind for a later pass to remove."""
+    state.metadata["needs_dce"] = True
+
+
+def run_pending_dce(state: Any) -> bool:
+    """Runs dead code elimination if some earlier pass asked for it.
+
+    IR that no pass has claimed to be clean is assumed to need it, since the
+    frontend leaves plenty of dead temporaries around. Returns whether
+    elimination ran.
+    """
+    if not state.metadata.get("needs_dce", True):
+        return False
+    ir_utils.dead_code_elimination(state.func_ir)
+    state.metadata["needs_dce"] = False
+    return True
+
+
+@register_pass(mutates_CFG=True, analysis_only=False)
+class CoalescedDCEPass(FunctionPass):
+    """Runs a single dead code elimination on behalf of the passes before it.
+
+    Rather than each of our passes cleaning up after itself, passes call
+    ``mark_needs_dce`` and this pass removes the dead code of all of them in
+    one walk over the IR.
+    """
+
+    _name = "coalesced_dce_pass"
+
+    def __init__(self) -> None:
+        FunctionPass.__init__(self)
+
+    def run_pass(self, state: Any) -> bool:
+        return run_pending_dce(state)
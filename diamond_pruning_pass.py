@@ -1,7 +1,64 @@
-from typing import Any
-from numba.core import ir, ir_utils
+import operator
+from collections import Counter
+from typing import Any, Dict, List, Set, Tuple
+from numba.core import ir
 from numba.core.compiler_machinery import FunctionPass, register_pass
 
+import dead_code_elimination_pass
+
+# Stands for a return value that isn't a known constant. None can't play this
+# role because returning None is common.
+_MISS = object()
+
+# The binops a pruned branch's condition is removed along with. They can't
+# raise on the values of compiled code, unlike division.
+_CONDITION_BINOPS = frozenset(
+    {
+        operator.lt,
+        operator.le,
+        operator.gt,
+        operator.ge,
+        operator.eq,
+        operator.ne,
+        operator.and_,
+        operator.or_,
+        operator.xor,
+    }
+)
+
+
+def _prune_target(
+    true_label: int,
+    false_label: int,
+    true_target: Any,
+    false_target: Any,
+    true_ret: Any,
+    false_ret: Any,
+) -> Any:
+    """Returns the label a prunable branch should jump to, or None.
+
+    ``true_target`` and ``false_target`` are where the branch's successors jump
+    to if they're trampolines, and ``true_ret`` and ``false_ret`` the constants
+    they return, or ``_MISS``.
+    """
+    # Case 1: Both jump to M (or match targets)
+    if true_target is not None and true_target == false_target:
+        return true_target
+
+    # Case 2: True block is effectively a jump to False label
+    if true_target == false_label:
+        return false_label
+
+    # Case 3: False block is effectively a jump to True label
+    if false_target == true_label:
+        return true_label
+
+    # Case 4: Both branches return the same constant
+    if true_ret is not _MISS and false_ret is not _MISS and true_ret == false_ret:
+        return true_label
+
+    return None
+
 
 @register_pass(mutates_CFG=True, analysis_only=False)
 class DiamondPruningPass(FunctionPass):
@@ -9,7 +66,11 @@ class DiamondPruningPass(FunctionPass):
     Removes diamond control flow patterns where both branches are empty or jump
     to the same target.
 
-    Runs a dead code elimination pass after.
+    Pruning repeats until no more diamonds can be removed, so nested diamonds
+    collapse in a single run: a pruned branch's condition is removed with it,
+    so the branches around it see an empty block. Dead code left behind by
+    earlier passes is removed first, since it would hide empty branches. The
+    dead code this pass leaves behind is left to ``CoalescedDCEPass``.
     """
 
     _name = "diamond_pruning_pass"
@@ -18,101 +79,243 @@ class DiamondPruningPass(FunctionPass):
         FunctionPass.__init__(self)
 
     def run_pass(self, state: Any) -> bool:
-        func_ir = state.func_ir
-        blocks = func_ir.blocks
-        changed = False
+        return prune_diamonds(state)
 
-        for block in list(blocks.values()):
-            if not isinstance(block.terminator, ir.Branch):
-                continue
 
-            true_label = block.terminator.truebr
-            false_label = block.terminator.falsebr
+def prune_diamonds(state: Any) -> bool:
+    """Prunes the diamonds in ``state.func_ir``. Returns whether any were."""
+    func_ir = state.func_ir
+    blocks = func_ir.blocks
 
-            true_target = self._get_jump_target(blocks, true_label)
-            false_target = self._get_jump_target(blocks, false_label)
+    # Only branch-terminated blocks can be pruned. Straight-line code, which
+    # is common in small inlined helpers, skips pruning entirely.
+    #
+    # ir.Branch and ir.Jump have no subclasses, so this module compares types
+    # exactly: it's cheaper than isinstance in these per-block loops.
+    branch_blocks = [
+        (label, block)
+        for label, block in blocks.items()
+        if type(block.terminator) is ir.Branch
+    ]
+    if not branch_blocks:
+        return False
 
-            # Case 1: Both jump to M (or match targets)
-            if (
-                true_target is not None
-                and false_target is not None
-                and true_target == false_target
-            ):
-                block.body[-1] = ir.Jump(true_target, block.terminator.loc)
-                changed = True
-                continue
+    dead_code_elimination_pass.run_pending_dce(state)
 
-            # Case 2: True block is effectively a jump to False label
-            if true_target is not None and true_target == false_label:
-                block.body[-1] = ir.Jump(false_label, block.terminator.loc)
-                changed = True
-                continue
+    # Index the successor blocks once so that each branch below is a couple
+    # of dict lookups instead of a rescan of its successors' bodies.
+    # Rewriting terminators keeps the indexes valid, so they're built once.
+    # There's nothing to reuse across compilations: Numba translates the
+    # bytecode into fresh IR for every signature it compiles.
+    jump_targets = _build_jump_targets(blocks)
+    return_consts = _build_return_consts(blocks)
+    uses = _count_uses(blocks)
+
+    # Prune to a fixpoint here rather than relying on the pipeline to
+    # schedule pruning again for nested diamonds.
+    changed = False
+    while _prune_branches(branch_blocks, jump_targets, return_consts, uses):
+        changed = True
+
+    if changed:
+        dead_code_elimination_pass.mark_needs_dce(state)
+
+    return changed
+
+
+def _prune_branches(
+    branch_blocks: List[Tuple[int, Any]],
+    jump_targets: Dict[int, int],
+    return_consts: Dict[int, Any],
+    uses: Counter,
+) -> bool:
+    """Replaces each prunable branch with a jump. Returns whether any were."""
+    changed = False
+
+    for label, block in branch_blocks:
+        # Skip branches that an earlier sweep already replaced.
+        if type(block.terminator) is not ir.Branch:
+            continue
+
+        true_label = block.terminator.truebr
+        false_label = block.terminator.falsebr
+
+        new_target = _prune_target(
+            true_label,
+            false_label,
+            jump_targets.get(true_label),
+            jump_targets.get(false_label),
+            return_consts.get(true_label, _MISS),
+            return_consts.get(false_label, _MISS),
+        )
+        if new_target is None:
+            continue
+
+        cond = block.terminator.cond
+        block.body[-1] = ir.Jump(new_target, block.terminator.loc)
+        _remove_dead_condition(block, cond, uses)
+        changed = True
+        # A block left with just the jump has become a trampoline; keep the
+        # index current for the blocks that branch to it.
+        if len(block.body) == 1:
+            jump_targets[label] = new_target
+
+    return changed
 
-            # Case 3: False block is effectively a jump to True label
-            if false_target is not None and false_target == true_label:
-                block.body[-1] = ir.Jump(true_label, block.terminator.loc)
-                changed = True
-                continue
 
-            # Case 4: Both branches return the same constant
-            true_ret = self._get_return_const(blocks, true_label)
-            false_ret = self._get_return_const(blocks, false_label)
+def _count_uses(blocks: Any) -> Counter:
+    """Counts the uses of every variable, by name."""
+    uses: Counter = Counter()
+    for blk in blocks.values():
+        for stmt in blk.body:
+            uses.update(var.name for var in stmt.list_vars())
+            if type(stmt) is ir.Assign:
+                uses[stmt.target.name] -= 1
+    return uses
 
-            if true_ret is not None and false_ret is not None and true_ret == false_ret:
-                block.body[-1] = ir.Jump(true_label, block.terminator.loc)
-                changed = True
 
-        if changed:
-            ir_utils.dead_code_elimination(func_ir)
+def _remove_dead_condition(block: Any, cond: ir.Var, uses: Counter) -> None:
+    """Removes the statements of ``block`` that only computed ``cond``.
 
+    Those are the comparison and ``bool()`` call the frontend emits for an
+    ``if``. Left in place, they'd keep the block from becoming a trampoline,
+    and a diamond around it from being pruned in the next round.
+    """
+    uses[cond.name] -= 1
+    dead = {cond.name}
+    bool_vars = {
+        stmt.target.name
+        for stmt in block.body
+        if type(stmt) is ir.Assign
+        and type(stmt.value) is ir.Global
+        and stmt.value.value is bool
+    }
+
+    kept = [block.body[-1]]
+    for stmt in reversed(block.body[:-1]):
+        if (
+            type(stmt) is not ir.Assign
+            or stmt.target.name not in dead
+            or uses[stmt.target.name]
+            or not _is_pure(stmt.value, bool_vars)
+        ):
+            kept.append(stmt)
+            continue
+        for var in stmt.list_vars():
+            if var is stmt.target:
+                continue
+            uses[var.name] -= 1
+            if var.is_temp and not uses[var.name]:
+                dead.add(var.name)
+    kept.reverse()
+    block.body = kept
+
+
+def _is_pure(value: Any, bool_vars: Set[str]) -> bool:
+    """Returns whether evaluating ``value`` has no effect but its result."""
+    if type(value) in (ir.Const, ir.Global, ir.FreeVar, ir.Var):
+        return True
+    if type(value) is not ir.Expr:
+        return False
+    if value.op == "binop":
+        return value.fn in _CONDITION_BINOPS
+    if value.op == "unary":
         return True
+    if value.op == "call":
+        return value.func.name in bool_vars and not (value.kws or value.vararg)
+    return False
+
+
+def _build_jump_targets(blocks: Any) -> Dict[int, int]:
+    """Maps the label of every block that's just a jump to its target."""
+    return {
+        label: blk.body[0].target
+        for label, blk in blocks.items()
+        if len(blk.body) == 1 and type(blk.body[0]) is ir.Jump
+    }
+
+
+def _build_return_consts(blocks: Any) -> Dict[int, Any]:
+    """Maps the label of every block that returns a constant to that constant."""
+    return_consts = {}
+    for label, blk in blocks.items():
+        const = _get_return_const(blk)
+        if const is not _MISS:
+            return_consts[label] = const
+    return return_consts
+
+
+def _get_return_const(blk: Any) -> Any:
+    if not blk.body or not isinstance(blk.body[-1], ir.Return):
+        return _MISS
+    if len(blk.body) <= 3:
+        return _get_short_return_const(blk.body)
+    term = blk.body[-1]
+
+    local_defs = {
+        stmt.target.name: stmt.value
+        for stmt in blk.body
+        if isinstance(stmt, ir.Assign)
+    }
+
+    # Walk the chain of copies and casts from the returned variable with
+    # Floyd's tortoise and hare. The hare hits the constant first; if the two
+    # ever meet on a variable instead, the chain is a cycle.
+    slow = fast = term.value
+    while True:
+        for _ in range(2):
+            if isinstance(fast, ir.Const):
+                return fast.value
+            if not isinstance(fast, ir.Var):
+                return _MISS
+            fast = _next_in_chain(local_defs, fast)
+
+        slow = _next_in_chain(local_defs, slow)
+        if isinstance(fast, ir.Var) and slow.name == fast.name:
+            return _MISS
+
+
+def _next_in_chain(local_defs: Dict[str, Any], var: ir.Var) -> Any:
+    """Returns the value ``var`` is a copy or cast of, or ``_MISS``."""
+    val = local_defs.get(var.name, _MISS)
+    if isinstance(val, ir.Expr) and val.op == "cast":
+        return val.value
+    return val
+
+
+def _get_short_return_const(body: List[Any]) -> Any:
+    """Resolves the returned constant of a block of at most three statements.
+
+    The frontend emits return blocks shaped like ``$c = const(...)``,
+    ``$r = cast($c)``, ``return $r``, and for those it's cheaper to look up
+    each definition in place than to build a dict of them.
+    """
+    var = body[-1].value
+    # Every step of a chain consumes a distinct assignment, so a chain that's
+    # longer than the block is a cycle.
+    for _ in range(len(body)):
+        if not isinstance(var, ir.Var):
+            break
+
+        val = next(
+            (
+                stmt.value
+                for stmt in reversed(body[:-1])
+                if isinstance(stmt, ir.Assign) and stmt.target.name == var.name
+            ),
+            _MISS,
+        )
+
+        if isinstance(val, ir.Const):
+            return val.value
+        elif isinstance(val, ir.Expr) and val.op == "cast":
+            var = val.value
+        elif isinstance(val, ir.Var):
+            var = val
+        else:
+            return _MISS
+
+    if isinstance(var, ir.Const):
+        return var.value
 
-    def _get_jump_target(self, blocks: Any, label: int) -> Any:
-        try:
-            blk = blocks[label]
-        except KeyError:
-            return None
-        if len(blk.body) == 1 and isinstance(blk.body[0], ir.Jump):
-            return blk.body[0].target
-        return None
-
-    def _get_return_const(self, blocks: Any, label: int) -> Any:
-        try:
-            term = blocks[label].body[-1]
-        except (KeyError, IndexError):
-            return None
-        if not isinstance(term, ir.Return):
-            return None
-
-        local_defs = {}
-        for stmt in blocks[label].body:
-            if isinstance(stmt, ir.Assign):
-                local_defs[stmt.target.name] = stmt.value
-
-        var = term.value
-
-        # Helper to resolve var to const
-        visited = set()
-        while isinstance(var, ir.Var):
-            if var.name in visited:
-                return None
-            visited.add(var.name)
-
-            if var.name not in local_defs:
-                return None
-
-            val = local_defs[var.name]
-
-            if isinstance(val, ir.Const):
-                return val.value
-            elif isinstance(val, ir.Expr) and val.op == "cast":
-                var = val.value
-            elif isinstance(val, ir.Var):
-                var = val
-            else:
-                return None
-
-        if isinstance(var, ir.Const):
-            return var.value
-
-        return None
+    return _MISS
@@ -0,0 +1,57 @@
+from typing import Any, Tuple
+from numba.core import ir
+from numba.core.analysis import dead_branch_prune
+from numba.core.compiler_machinery import FunctionPass, register_pass
+
+import dead_code_elimination_pass
+import diamond_pruning_pass
+import inlining
+
+
+@register_pass(mutates_CFG=True, analysis_only=False)
+class InlineAndPruneSweep(FunctionPass):
+    """Inlines calls and prunes branches in one pass, until neither applies.
+
+    Does the work of ``InlineAllCallsPass``, Numba's ``DeadBranchPrune`` and
+    ``DiamondPruningPass`` scheduled back to back. Inlining exposes constant
+    conditions and diamonds from the callees' bodies at the call site, so the
+    three are interleaved in rounds until a round changes nothing.
+
+    Leaves the dead code it produces to ``CoalescedDCEPass``.
+    """
+
+    _name = "inline_and_prune_sweep"
+
+    def __init__(self) -> None:
+        FunctionPass.__init__(self)
+
+    def run_pass(self, state: Any) -> bool:
+        changed = False
+        while True:
+            inlined = inlining.inline_all_calls(state.func_ir)
+            if inlined:
+                dead_code_elimination_pass.mark_needs_dce(state)
+
+            # Prunes branches on conditions that are constant, like flags that
+            # inlined helpers test. It doesn't report whether it pruned any,
+            # but each branch it prunes becomes a jump, and the blocks it
+            # leaves unreachable are removed.
+            shape_before = _cfg_shape(state.func_ir)
+            dead_branch_prune(state.func_ir, state.args)
+            if _cfg_shape(state.func_ir) != shape_before:
+                dead_code_elimination_pass.mark_needs_dce(state)
+                changed = True
+
+            pruned = diamond_pruning_pass.prune_diamonds(state)
+            if not (inlined or pruned):
+                break
+            changed = True
+
+        return changed
+
+
+def _cfg_shape(func_ir: Any) -> Tuple[int, int]:
+    """Returns the number of blocks of ``func_ir``, and of branches among them."""
+    blocks = func_ir.blocks
+    num_branches = sum(type(blk.terminator) is ir.Branch for blk in blocks.values())
+    return len(blocks), num_branches
@@ -1,8 +1,14 @@
-from typing import Any
+from inspect import CO_VARARGS
+from typing import Any, Dict
 from numba.core import ir
 from numba.core.compiler_machinery import FunctionPass, register_pass
 from numba.core.inline_closurecall import inline_closure_call
-from numba.core import ir_utils
+
+import dead_code_elimination_pass
+
+# Builtins that are commonly called from traced code but have no Python source
+# to inline.
+_UNINLINEABLE = (bool, int, float, str, tuple, list, dict, set, type, len, range, print)
 
 
 @register_pass(mutates_CFG=True, analysis_only=False)
@@ -14,7 +20,7 @@ class InlineAllCallsPass(FunctionPass):
     inlines closures for type inference. This pass forces inlining of global
     functions and ``njit``-compiled functions to ensure a flat trace.
 
-    Runs a dead code elimination pass after inlining to remove dead code.
+    Leaves the dead code produced by inlining to ``CoalescedDCEPass``.
     """
 
     _name = "inline_all_calls_pass"
@@ -23,75 +29,142 @@ class InlineAllCallsPass(FunctionPass):
         FunctionPass.__init__(self)
 
     def run_pass(self, state: Any) -> bool:
-        # A list of basic blocks to process. Blocks that are processes get
-        # removed from the worklist, but as functions get inlined, the worklist
-        # grows.
-        work_list = list(state.func_ir.blocks.items())
-
-        while work_list:
-            _, block = work_list.pop()
-            for i, instr in enumerate(block.body):
-                if isinstance(instr, ir.Assign):
-                    expr = instr.value
-                    if not (isinstance(expr, ir.Expr) and expr.op == "call"):
-                        continue
-
-                    def impl(func_ir: Any, block: Any, i: int, expr: Any) -> bool:
-                        func_def = ir_utils.get_definition(func_ir, expr.func)
-                        func_obj = None
-
-                        if isinstance(func_def, (ir.Global, ir.FreeVar)):
-                            func_obj = getattr(func_def, "value", None)
-
-                        # Handle getattr (method calls like Class.method)
-                        elif isinstance(func_def, ir.Expr) and func_def.op == "getattr":
-                            # Get the object the method is being called on
-                            obj_def = ir_utils.get_definition(func_ir, func_def.value)
-                            if isinstance(obj_def, (ir.Global, ir.FreeVar)):
-                                obj = getattr(obj_def, "value", None)
-                                if obj is not None:
-                                    # Get the method from the object
-                                    attr_name = func_def.attr
-                                    func_obj = getattr(obj, attr_name, None)
-
-                        # Handle CPUDispatcher (njit functions)
-                        if func_obj and hasattr(func_obj, "py_func"):
-                            func_obj = func_obj.py_func
-
-                        if (
-                            func_obj
-                            and callable(func_obj)
-                            and not isinstance(func_obj, type)
-                            and hasattr(func_obj, "__code__")
-                        ):
-                            inline_closure_call(
-                                func_ir,
-                                func_ir.func_id.func.__globals__,
-                                block,
-                                i,
-                                func_obj,
-                                work_list=work_list,
-                            )
-                            return True
-
-                        if (
-                            isinstance(func_def, ir.Expr)
-                            and func_def.op == "make_function"
-                        ):
-                            inline_closure_call(
-                                func_ir,
-                                func_ir.func_id.func.__globals__,
-                                block,
-                                i,
-                                func_def,
-                                work_list=work_list,
-                            )
-                            return True
-
-                        return False
-
-                    if ir_utils.guard(impl, state.func_ir, block, i, expr):
-                        break
-
-        ir_utils.dead_code_elimination(state.func_ir, list(state.func_ir.blocks.keys()))
+        if not inline_all_calls(state.func_ir):
+            return False
+        dead_code_elimination_pass.mark_needs_dce(state)
         return True
+
+
+def inline_all_calls(func_ir: Any) -> bool:
+    """Inlines every call in ``func_ir`` it can. Returns whether any were."""
+    globals_dict = func_ir.func_id.func.__globals__
+
+    # A stack of basic blocks to process. Blocks that are processes get
+    # removed from the worklist, but as functions get inlined, the worklist
+    # grows: inline_closure_call splits the block at the call site and
+    # pushes both the callee's blocks and the block's tail, so scanning
+    # resumes right after the inlined call instead of rescanning the
+    # prefix. The order blocks are processed in doesn't matter, since every
+    # block is scanned until it has no call left to inline.
+    work_list = list(func_ir.blocks.items())
+
+    # Call sites often share a callee, or a receiver for method calls.
+    # Memoize their definitions until the next inline mutates the IR.
+    definitions: Dict[str, Any] = {}
+
+    changed = False
+    while work_list:
+        _, block = work_list.pop()
+        call_sites = [
+            (i, instr.value)
+            for i, instr in enumerate(block.body)
+            if isinstance(instr, ir.Assign)
+            and isinstance(instr.value, ir.Expr)
+            and instr.value.op == "call"
+        ]
+        for i, expr in call_sites:
+            # Inlining splits the block, and its tail is queued as a new
+            # block, so the remaining call sites are rescanned from there.
+            if _try_inline_call(
+                func_ir,
+                block,
+                i,
+                expr,
+                globals_dict,
+                work_list,
+                definitions,
+            ):
+                definitions.clear()
+                changed = True
+                break
+
+    return changed
+
+
+def _get_definition(func_ir: Any, definitions: Dict[str, Any], var: Any) -> Any:
+    """Memoized ``func_ir.get_definition``.
+
+    Returns None for variables without a unique definition, whose callees we
+    can't know.
+    """
+    name = var.name if isinstance(var, ir.Var) else var
+    if name not in definitions:
+        try:
+            definitions[name] = func_ir.get_definition(var)
+        except KeyError:
+            definitions[name] = None
+    return definitions[name]
+
+
+def _try_inline_call(
+    func_ir: Any,
+    block: Any,
+    i: int,
+    expr: Any,
+    globals_dict: Dict[str, Any],
+    work_list: Any,
+    definitions: Dict[str, Any],
+) -> bool:
+    """Inlines the call ``expr`` at ``block.body[i]`` if its callee is known.
+
+    Returns whether the call was inlined.
+    """
+    func_def = _get_definition(func_ir, definitions, expr.func)
+    func_obj = None
+
+    if isinstance(func_def, (ir.Global, ir.FreeVar)):
+        if func_def.value in _UNINLINEABLE:
+            return False
+        func_obj = func_def.value
+
+    # Handle getattr (method calls like Class.method)
+    elif isinstance(func_def, ir.Expr) and func_def.op == "getattr":
+        # Get the object the method is being called on
+        obj_def = _get_definition(func_ir, definitions, func_def.value)
+        if isinstance(obj_def, (ir.Global, ir.FreeVar)):
+            obj = obj_def.value
+            if obj is not None:
+                # Get the method from the object
+                attr_name = func_def.attr
+                func_obj = getattr(obj, attr_name, None)
+
+    # Handle CPUDispatcher (njit functions)
+    if func_obj and hasattr(func_obj, "py_func"):
+        func_obj = func_obj.py_func
+
+    # The inliner doesn't support star args, in calls or in callees, so those
+    # calls are left to Numba to compile.
+    if expr.vararg or (
+        hasattr(func_obj, "__code__") and func_obj.__code__.co_flags & CO_VARARGS
+    ):
+        return False
+
+    if (
+        func_obj
+        and callable(func_obj)
+        and not isinstance(func_obj, type)
+        and hasattr(func_obj, "__code__")
+    ):
+        inline_closure_call(
+            func_ir,
+            globals_dict,
+            block,
+            i,
+            func_obj,
+            work_list=work_list,
+        )
+        return True
+
+    if isinstance(func_def, ir.Expr) and func_def.op == "make_function":
+        inline_closure_call(
+            func_ir,
+            globals_dict,
+            block,
+            i,
+            func_def,
+            work_list=work_list,
+        )
+        return True
+
+    return False
+
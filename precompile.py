@@ -0,0 +1,35 @@
+import functools
+import importlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterable, Tuple
+from numba.core import sigutils
+
+
+def _compile_into_cache(job: Tuple[str, str, Tuple[Any, ...]]) -> None:
+    module_name, qualname, arg_types = job
+    func = functools.reduce(
+        getattr, qualname.split("."), importlib.import_module(module_name)
+    )
+    func.compile(arg_types)
+
+
+def precompile_all(
+    jobs: Iterable[Tuple[Any, Any]], max_workers: int | None = None
+) -> None:
+    """Compiles many ``njit`` functions in parallel worker processes.
+
+    ``jobs`` holds ``(dispatcher, signature)`` pairs. Each dispatcher must be
+    declared with ``@njit(cache=True)`` and be importable by its module and
+    qualified name, since the workers compile into Numba's on-disk cache and
+    this process picks up the machine code from there on first call. Threads
+    wouldn't help here: compilation holds the GIL.
+    """
+    work = []
+    for func, signature in jobs:
+        # Numba's cache is keyed on argument types alone, so compile for those
+        # for the entries to be found later.
+        arg_types, _ = sigutils.normalize_signature(signature)
+        work.append((func.py_func.__module__, func.py_func.__qualname__, arg_types))
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        list(pool.map(_compile_into_cache, work))
@@ -0,0 +1,85 @@
+import numba
+from numba.core import ir, untyped_passes
+from numba.core.compiler import CompilerBase, DefaultPassBuilder
+from numba.core.compiler_machinery import FunctionPass, register_pass
+from dead_code_elimination_pass import CoalescedDCEPass
+
+
+# Define a pass that claims the IR is already free of dead code
+@register_pass(mutates_CFG=False, analysis_only=True)
+class MarkCleanPassForTesting(FunctionPass):
+    _name = "test_mark_clean_pass"
+
+    def __init__(self):
+        FunctionPass.__init__(self)
+
+    def run_pass(self, state):
+        state.metadata["needs_dce"] = False
+        return False
+
+
+# Define an Inspector pass to capture IR
+@register_pass(mutates_CFG=False, analysis_only=True)
+class DCEInspectorPass(FunctionPass):
+    _name = "dce_inspector_pass"
+
+    def __init__(self):
+        FunctionPass.__init__(self)
+
+    def run_pass(self, state):
+        TestCoalescedDCEIntegration.last_func_ir = state.func_ir
+        return False
+
+
+def has_dead_assignment(func_ir):
+    return any(
+        isinstance(stmt, ir.Assign) and stmt.target.name == "unused"
+        for blk in func_ir.blocks.values()
+        for stmt in blk.body
+    )
+
+
+class TestCoalescedDCEIntegration:
+    last_func_ir = None
+
+    def setup_method(self):
+        TestCoalescedDCEIntegration.last_func_ir = None
+
+    def test_removes_dead_code_by_default(self):
+        """IR that no pass has marked clean gets dead code eliminated"""
+
+        class DCETestCompiler(CompilerBase):
+            def define_pipelines(self):
+                pm = DefaultPassBuilder.define_nopython_pipeline(self.state)
+                pm.add_pass_after(CoalescedDCEPass, untyped_passes.IRProcessing)
+                pm.add_pass_after(DCEInspectorPass, CoalescedDCEPass)
+                pm.finalize()
+                return [pm]
+
+        @numba.njit(pipeline_class=DCETestCompiler)
+        def func_with_dead_code(x):
+            unused = x * 2
+            return x + 1
+
+        assert func_with_dead_code(1) == 2
+        assert not has_dead_assignment(self.last_func_ir)
+
+    def test_skips_ir_marked_clean(self):
+        """IR that an earlier pass marked clean is left alone"""
+
+        class DCETestCompiler(CompilerBase):
+            def define_pipelines(self):
+                pm = DefaultPassBuilder.define_nopython_pipeline(self.state)
+                pm.add_pass_after(MarkCleanPassForTesting, untyped_passes.IRProcessing)
+                pm.add_pass_after(CoalescedDCEPass, MarkCleanPassForTesting)
+                pm.add_pass_after(DCEInspectorPass, CoalescedDCEPass)
+                pm.finalize()
+                return [pm]
+
+        @numba.njit(pipeline_class=DCETestCompiler)
+        def func_with_dead_code(x):
+            unused = x * 2
+            return x + 1
+
+        assert func_with_dead_code(1) == 2
+        assert has_dead_assignment(self.last_func_ir)
@@ -152,3 +152,75 @@ class TestDiamondPruningIntegration:
         assert not has_branch, (
             "Diamond pruning failed to remove the branch in func_with_unused_branch"
         )
+
+    def test_integration_identical_none_returns(self):
+        """Test Case 4 (Identical Returns) when both branches return None"""
+
+        class PruningTestCompiler(CompilerBase):
+            def define_pipelines(self):
+                pm = DefaultPassBuilder.define_nopython_pipeline(self.state)
+                pm.add_pass_after(DiamondPruningPass, untyped_passes.IRProcessing)
+                pm.add_pass_after(DeadCodeEliminationPassForTesting, DiamondPruningPass)
+                pm.add_pass_after(InspectorPass, DeadCodeEliminationPassForTesting)
+                pm.finalize()
+                return [pm]
+
+        @numba.njit(pipeline_class=PruningTestCompiler)
+        def func_identical_none_returns(x):
+            if x > 0:
+                return None
+            else:
+                return None
+
+        # Compile and check result correctness
+        assert func_identical_none_returns(1) is None
+        assert func_identical_none_returns(-1) is None
+
+        # Check IR for absence of Branch
+        func_ir = self.last_func_ir
+        assert func_ir is not None
+
+        has_branch = False
+        for blk in func_ir.blocks.values():
+            if isinstance(blk.terminator, ir.Branch):
+                has_branch = True
+                break
+
+        assert not has_branch, (
+            "Diamond pruning failed to remove the branch in func_identical_none_returns"
+        )
+
+    def test_integration_nested_empty_branches(self):
+        """Test that nested diamonds collapse in a single run of the pass"""
+
+        class PruningTestCompiler(CompilerBase):
+            def define_pipelines(self):
+                pm = DefaultPassBuilder.define_nopython_pipeline(self.state)
+                pm.add_pass_after(DiamondPruningPass, untyped_passes.IRProcessing)
+                pm.add_pass_after(InspectorPass, DiamondPruningPass)
+                pm.finalize()
+                return [pm]
+
+        @numba.njit(pipeline_class=PruningTestCompiler)
+        def func_nested_empty_branches(x, y):
+            if x > 0:
+                if y > 0:
+                    pass
+                else:
+                    pass
+            else:
+                pass
+            return x
+
+        # Compile and check result correctness
+        assert func_nested_empty_branches(1, 1) == 1
+        assert func_nested_empty_branches(-1, 1) == -1
+
+        # Check IR for absence of Branch
+        func_ir = self.last_func_ir
+        assert func_ir is not None
+
+        num_branches = sum(
+            isinstance(blk.terminator, ir.Branch) for blk in func_ir.blocks.values()
+        )
+        assert num_branches == 0, "Diamond pruning failed to remove nested branches"
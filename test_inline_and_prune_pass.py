@@ -0,0 +1,109 @@
+import numba
+from numba import njit
+from numba.core import ir, untyped_passes
+from numba.core.compiler import CompilerBase, DefaultPassBuilder
+from numba.core.compiler_machinery import FunctionPass, register_pass
+from dead_code_elimination_pass import CoalescedDCEPass
+from inline_and_prune_pass import InlineAndPruneSweep
+
+
+@njit
+def increment_if_positive(x):
+    # Both branches are empty once inlined, so the diamond is pruned
+    if x > 0:
+        pass
+    else:
+        pass
+    return x + 1
+
+
+# Define an Inspector pass to capture IR
+@register_pass(mutates_CFG=False, analysis_only=True)
+class SweepInspectorPass(FunctionPass):
+    _name = "sweep_inspector_pass"
+
+    def __init__(self):
+        FunctionPass.__init__(self)
+
+    def run_pass(self, state):
+        TestInlineAndPruneSweepIntegration.last_func_ir = state.func_ir
+        return False
+
+
+@register_pass(mutates_CFG=True, analysis_only=False)
+class RecordingSweepForTesting(InlineAndPruneSweep):
+    _name = "recording_sweep_for_testing"
+
+    def run_pass(self, state):
+        changed = InlineAndPruneSweep.run_pass(self, state)
+        TestInlineAndPruneSweepIntegration.last_changed = changed
+        return changed
+
+
+class TestInlineAndPruneSweepIntegration:
+    last_func_ir = None
+    last_changed = None
+
+    def setup_method(self):
+        TestInlineAndPruneSweepIntegration.last_func_ir = None
+        TestInlineAndPruneSweepIntegration.last_changed = None
+
+    def test_inlined_diamond_is_pruned(self):
+        """Test that a diamond from an inlined callee is pruned in the same pass"""
+
+        class SweepTestCompiler(CompilerBase):
+            def define_pipelines(self):
+                pm = DefaultPassBuilder.define_nopython_pipeline(self.state)
+                pm.add_pass_after(InlineAndPruneSweep, untyped_passes.IRProcessing)
+                pm.add_pass_after(CoalescedDCEPass, InlineAndPruneSweep)
+                pm.add_pass_after(SweepInspectorPass, CoalescedDCEPass)
+                pm.finalize()
+                return [pm]
+
+        @numba.njit(pipeline_class=SweepTestCompiler)
+        def func_calling_helper(x):
+            return increment_if_positive(x) * 2
+
+        # Compile and check result correctness
+        assert func_calling_helper(1) == 4
+        assert func_calling_helper(-1) == 0
+
+        # Check IR for absence of the call and of Branch
+        func_ir = self.last_func_ir
+        assert func_ir is not None
+
+        for blk in func_ir.blocks.values():
+            assert not isinstance(blk.terminator, ir.Branch), (
+                "Sweep failed to prune the diamond inlined from increment_if_positive"
+            )
+            for stmt in blk.body:
+                if (
+                    isinstance(stmt, ir.Assign)
+                    and isinstance(stmt.value, ir.Expr)
+                    and stmt.value.op == "call"
+                ):
+                    callee = func_ir.get_definition(stmt.value.func)
+                    assert callee.value is not increment_if_positive
+
+    def test_dead_branch_prune_is_reported(self):
+        """Test that pruning a constant branch alone counts as a change"""
+
+        class SweepTestCompiler(CompilerBase):
+            def define_pipelines(self):
+                pm = DefaultPassBuilder.define_nopython_pipeline(self.state)
+                pm.add_pass_after(
+                    RecordingSweepForTesting, untyped_passes.IRProcessing
+                )
+                pm.finalize()
+                return [pm]
+
+        # Nothing to inline and no diamond, but the branch is dead.
+        @numba.njit(pipeline_class=SweepTestCompiler)
+        def func_with_constant_flag(x):
+            debug = False
+            if debug:
+                return 0
+            return x + 1
+
+        assert func_with_constant_flag(1) == 2
+        assert self.last_changed is True
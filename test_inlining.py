@@ -2,17 +2,17 @@
 from numba import njit
 
 
-@njit
+@njit(cache=True)
 def func_add(x):
     return x + 1
 
 
-@njit
+@njit(cache=True)
 def func_sub(x):
     return x - 2
 
 
-@njit
+@njit(cache=True)
 def func_mul(x):
     return x * 3
 
@@ -30,6 +30,7 @@ class TestInlining:
         from numba.core import ir
         from numba import njit
         import numba
+        import dead_code_elimination_pass
         import inlining
 
         # VerifyNoCallsPass definition
@@ -83,8 +84,15 @@ class TestInlining:
                 pm.add_pass_after(
                     inlining.InlineAllCallsPass, numba.core.untyped_passes.IRProcessing
                 )
+                # Remove the dead code inlining leaves behind
+                pm.add_pass_after(
+                    dead_code_elimination_pass.CoalescedDCEPass,
+                    inlining.InlineAllCallsPass,
+                )
                 # Add Verification pass
-                pm.add_pass_after(VerifyNoCallsPass, inlining.InlineAllCallsPass)
+                pm.add_pass_after(
+                    VerifyNoCallsPass, dead_code_elimination_pass.CoalescedDCEPass
+                )
                 pm.finalize()
                 return [pm]
 
@@ -0,0 +1,15 @@
+from numba import njit
+import precompile
+
+
+@njit(cache=True)
+def _precompiled_double(x: float) -> float:
+    return x * 2.0
+
+
+class TestPrecompileAll:
+    def test_precompile_all_populates_cache(self):
+        precompile.precompile_all([(_precompiled_double, "float64(float64)")])
+
+        assert _precompiled_double(1.5) == 3.0
+        assert sum(_precompiled_double.stats.cache_hits.values()) == 1
@@ -1,4 +1,9 @@
-from typing import NamedTuple
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, NamedTuple
+import numba
+import numpy as np
+import pytest
 from numba import njit
 import tracer
 
@@ -9,6 +14,16 @@ class User(NamedTuple):
     metric3: int
 
 
+# Test inputs, built once and shared by the tests below.
+USERS = {
+    "high_metrics": User(metric1=0.6, metric2=0.6, metric3=6),
+    "low_metric3": User(metric1=0.6, metric2=0.6, metric3=1),
+    "medium_metric1": User(metric1=0.4, metric2=0.6, metric3=1),
+    "high_weighted_score": User(metric1=0.9, metric2=0.9, metric3=1),
+    "medium_weighted_score": User(metric1=0.5, metric2=0.5, metric3=6),
+}
+
+
 class TestMakeSimplestDecision:
     @staticmethod
     def make_simplest_decision(user: tracer.Traceable[User]) -> bool:
@@ -17,11 +32,9 @@ class TestMakeSimplestDecision:
     traced_make_simplest_decision = tracer.trace(make_simplest_decision.__func__)
 
     def test_make_simplest_decision_case_1(self):
-        u = User(metric1=0.6, metric2=0.6, metric3=6)
+        u = USERS["high_metrics"]
         result = TestMakeSimplestDecision.traced_make_simplest_decision(u)
         assert result is self.make_simplest_decision(u)
-        print("Input:", u)
-        print("Result:", result)
 
         ir = TestMakeSimplestDecision.traced_make_simplest_decision.trace.to_ir()
         assert isinstance(ir, tracer.Return)
@@ -30,11 +43,9 @@ class TestMakeSimplestDecision:
         assert str(ir) == "return (metric3 > 5)"
 
     def test_make_simplest_decision_case_2(self):
-        u = User(metric1=0.6, metric2=0.6, metric3=1)
+        u = USERS["low_metric3"]
         result = TestMakeSimplestDecision.traced_make_simplest_decision(u)
         assert result is self.make_simplest_decision(u)
-        print("Input:", u)
-        print("Result:", result)
 
         ir = TestMakeSimplestDecision.traced_make_simplest_decision.trace.to_ir()
         assert isinstance(ir, tracer.Return)
@@ -42,63 +53,111 @@ class TestMakeSimplestDecision:
         assert ir.expression.value is False
         assert str(ir) == "return (metric3 > 5)"
 
+    def test_attribute_reads_are_not_logged(self):
+        traced = TestMakeSimplestDecision.traced_make_simplest_decision
+        traced(USERS["high_metrics"])
+        events = traced.trace.events
+        assert all(e.op != "getattr" for e in events)
+
+        # The operands read from attributes are still named after them, and
+        # every temporary operand is the output of an earlier event.
+        outputs = set()
+        for event in events:
+            for name, _ in event.inputs:
+                if name.startswith("$") and not name.startswith("$const"):
+                    assert name in outputs
+            outputs.add(event.output_var)
+        assert str(traced.trace.to_ir()) == "return (metric3 > 5)"
+
 
 class TestMakeDecision:
     @staticmethod
     def make_decision(user: tracer.Traceable[User]) -> bool:
-        return user.metric1 > 0.3 and user.metric2 > 0.4 and user.metric3 > 5
+        return tracer.all_(user.metric1 > 0.3, user.metric2 > 0.4, user.metric3 > 5)
 
     traced_make_decision = tracer.trace(make_decision.__func__)
 
     def test_make_decision_case_1(self):
-        u = User(metric1=0.6, metric2=0.6, metric3=1)
+        u = USERS["low_metric3"]
         result = TestMakeDecision.traced_make_decision(u)
         assert result is self.make_decision(u)
 
         ir = TestMakeDecision.traced_make_decision.trace.to_ir()
-        assert isinstance(ir, tracer.Conditional)
-        assert ir.condition.text == "(metric1 > 0.3000)"
-        assert ir.condition.value is True
-
-        expected_str = """if (metric1 > 0.3000) (=True):
-  if (metric2 > 0.4000) (=True):
-    return (metric3 > 5)"""
-        assert str(ir) == expected_str
-
-        ir = ir.value
-        assert isinstance(ir, tracer.Conditional)
-        assert ir.condition.text == "(metric2 > 0.4000)"
-        assert ir.condition.value is True
-
-        ir = ir.value
         assert isinstance(ir, tracer.Return)
-        assert ir.expression.text == "(metric3 > 5)"
         assert ir.expression.value is False
 
+        expected_str = (
+            "return (((metric1 > 0.3000) & (metric2 > 0.4000)) & (metric3 > 5))"
+        )
+        assert str(ir) == expected_str
+
     def test_make_decision_case_2(self):
-        u = User(metric1=0.4, metric2=0.6, metric3=1)
+        u = USERS["medium_metric1"]
         result = TestMakeDecision.traced_make_decision(u)
         assert result is self.make_decision(u)
 
         ir = TestMakeDecision.traced_make_decision.trace.to_ir()
-        assert isinstance(ir, tracer.Conditional)
-        assert ir.condition.text == "(metric1 > 0.3000)"
-        assert ir.condition.value is True
+        assert isinstance(ir, tracer.Return)
+        assert ir.expression.value is False
 
-        expected_str = """if (metric1 > 0.3000) (=True):
-  if (metric2 > 0.4000) (=True):
-    return (metric3 > 5)"""
+        expected_str = (
+            "return (((metric1 > 0.3000) & (metric2 > 0.4000)) & (metric3 > 5))"
+        )
         assert str(ir) == expected_str
 
-        ir = ir.value
-        assert isinstance(ir, tracer.Conditional)
-        assert ir.condition.text == "(metric2 > 0.4000)"
-        assert ir.condition.value is True
+    def test_make_decision_all_true(self):
+        u = USERS["high_metrics"]
+        result = TestMakeDecision.traced_make_decision(u)
+        assert result is True
 
-        ir = ir.value
+        ir = TestMakeDecision.traced_make_decision.trace.to_ir()
         assert isinstance(ir, tracer.Return)
-        assert ir.expression.text == "(metric3 > 5)"
-        assert ir.expression.value is False
+        assert ir.expression.value is True
+
+
+class TestAll:
+    def test_no_conditions(self):
+        @tracer.trace
+        def no_conditions(x: float) -> bool:
+            return tracer.all_()
+
+        assert no_conditions(1.0) is True
+
+    def test_star_args(self):
+        @tracer.trace
+        def star_args(conds: tracer.Traceable[tuple]) -> bool:
+            return tracer.all_(*conds)
+
+        assert star_args((True, True)) is True
+        assert star_args((True, False)) is False
+
+    def test_single_condition_matches_untraced(self):
+        @tracer.trace
+        def single_condition(x: tracer.Traceable[int]) -> int:
+            return tracer.all_(x)
+
+        assert single_condition(11) == tracer.all_(11) == 1
+        assert single_condition.trace.pretty_print() == "return (True & x)"
+
+    def test_mixed_conditions_untraced(self):
+        @njit
+        def mixed_conditions(x: float, flag: int) -> int:
+            return tracer.all_(x > 1.0, flag)
+
+        assert mixed_conditions(2.0, 3) == (True & (2.0 > 1.0) & 3)
+        assert mixed_conditions(0.0, 3) == 0
+
+    def test_conjunction_in_inlined_helper(self):
+        @njit
+        def both_positive(x: float, y: float) -> bool:
+            return tracer.all_(x > 0.0, y > 0.0)
+
+        @tracer.trace
+        def decide(x: tracer.Traceable[float], y: tracer.Traceable[float]) -> bool:
+            return both_positive(x, y)
+
+        assert decide(1.0, -1.0) is False
+        assert decide.trace.pretty_print() == "return ((x > 0.0000) & (y > 0.0000))"
 
 
 class TestMakeDecisionNestedIfs:
@@ -117,17 +176,8 @@ class TestMakeDecisionNestedIfs:
 
     traced_make_decision_nested_ifs = tracer.trace(make_decision_nested_ifs.__func__)
 
-    def test_nested_ifs_case_1(self):
-        u = User(metric1=0.6, metric2=0.6, metric3=6)
-        result = TestMakeDecisionNestedIfs.traced_make_decision_nested_ifs(u)
-        assert result is self.make_decision_nested_ifs(u)
-
-        ir = TestMakeDecisionNestedIfs.traced_make_decision_nested_ifs.trace.to_ir()
-
-        expected_str = """if (metric1 > 0.3000) (=True):
-  if (metric2 > 0.4000) (=True):
-    if (metric3 > 5) (=True):
-      return True"""
+    @staticmethod
+    def _assert_nested_ir(ir, expected_str, last_val):
         assert str(ir) == expected_str
 
         assert isinstance(ir, tracer.Conditional)
@@ -143,69 +193,86 @@ class TestMakeDecisionNestedIfs:
 
         ir = ir.value
         assert isinstance(ir, tracer.Return)
-        assert ir.expression.text == "True"
-        assert ir.expression.value is True
-
-    def test_nested_ifs_case_2(self):
-        u = User(metric1=0.4, metric2=0.6, metric3=1)
+        assert ir.expression.text == str(last_val)
+        assert ir.expression.value is last_val
+
+    @pytest.mark.parametrize(
+        "user_key, expected_str, last_val",
+        [
+            (
+                "high_metrics",
+                """if (metric1 > 0.3000) (=True):
+  if (metric2 > 0.4000) (=True):
+    if (metric3 > 5) (=True):
+      return True""",
+                True,
+            ),
+            (
+                "medium_metric1",
+                """if (metric1 > 0.3000) (=True):
+  if (metric2 > 0.4000) (=True):
+    if (metric3 > 5) (=False):
+      return False""",
+                False,
+            ),
+        ],
+    )
+    def test_nested_ifs(self, user_key, expected_str, last_val):
+        u = USERS[user_key]
         result = TestMakeDecisionNestedIfs.traced_make_decision_nested_ifs(u)
         assert result is self.make_decision_nested_ifs(u)
 
         ir = TestMakeDecisionNestedIfs.traced_make_decision_nested_ifs.trace.to_ir()
+        self._assert_nested_ir(ir, expected_str, last_val)
 
-        expected_str = """if (metric1 > 0.3000) (=True):
-  if (metric2 > 0.4000) (=True):
-    if (metric3 > 5) (=False):
-      return False"""
-        assert str(ir) == expected_str
+    def test_deeply_nested_ifs_format(self):
+        depth = 5000
+        ir = tracer.Return(tracer.Expression("x", 1))
+        for _ in range(depth):
+            ir = tracer.Conditional(tracer.Expression("(x > 0)", True), ir)
 
-        assert isinstance(ir, tracer.Conditional)
-        assert ir.condition.text == "(metric1 > 0.3000)"
+        lines = str(ir).splitlines()
+        assert len(lines) == depth + 1
+        assert lines[-1] == "  " * depth + "return x"
 
-        ir = ir.value
-        assert isinstance(ir, tracer.Conditional)
-        assert ir.condition.text == "(metric2 > 0.4000)"
 
-        ir = ir.value
-        assert isinstance(ir, tracer.Conditional)
-        assert ir.condition.text == "(metric3 > 5)"
+# The njit helpers the traced functions call are compiled eagerly for
+# explicit signatures, so the first test to call them doesn't pay for their
+# compilation. They live at module scope and are cached on disk, so later
+# processes load them instead of compiling them again.
+@njit(numba.float64(numba.typeof(USERS["high_metrics"])), cache=True)
+def _compute_weighted_score(user: User) -> float:
+    return user.metric1 * 0.7 + user.metric2 * 0.3
 
-        ir = ir.value
-        assert isinstance(ir, tracer.Return)
-        assert ir.expression.text == "False"
-        assert ir.expression.value is False
 
+@njit("boolean(float64)", cache=True)
+def _is_safe_to_proceed(score: float) -> bool:
+    if score < 0.2:
+        return False
+    return True
 
-class TestMakeDecisionHierarchically:
-    @staticmethod
-    @njit
-    def _compute_weighted_score(user: User) -> float:
-        return user.metric1 * 0.7 + user.metric2 * 0.3
 
-    @staticmethod
-    @njit
-    def _is_safe_to_proceed(score: float) -> bool:
-        if score < 0.2:
-            return False
-        return True
+@njit("boolean()", cache=True)
+def _check_system_status() -> bool:
+    # Condition that does not depend on User
+    maintenance_mode = False
+    if maintenance_mode:
+        return False
+    return True
 
-    @staticmethod
-    @njit
-    def _check_system_status() -> bool:
-        # Condition that does not depend on User
-        maintenance_mode = False
-        if maintenance_mode:
-            return False
-        return True
 
+class TestMakeDecisionHierarchically:
+    # Untraced calls run the whole decision as one compiled function, rather
+    # than crossing into each helper from Python.
     @staticmethod
+    @njit(cache=True)
     def make_decision_hierarchically(user: tracer.Traceable[User]) -> bool:
-        if not TestMakeDecisionHierarchically._check_system_status():
+        if not _check_system_status():
             return False
 
-        weighted_score = TestMakeDecisionHierarchically._compute_weighted_score(user)
+        weighted_score = _compute_weighted_score(user)
 
-        if not TestMakeDecisionHierarchically._is_safe_to_proceed(weighted_score):
+        if not _is_safe_to_proceed(weighted_score):
             return False
 
         if weighted_score > 0.8:
@@ -222,12 +289,11 @@ class TestMakeDecisionHierarchically:
     )
 
     def test_high_weighted_score(self):
-        u = User(metric1=0.9, metric2=0.9, metric3=1)
+        u = USERS["high_weighted_score"]
         result = TestMakeDecisionHierarchically.traced_make_decision_hierarchically(u)
         assert result is self.make_decision_hierarchically(u)
 
         ir = TestMakeDecisionHierarchically.traced_make_decision_hierarchically.trace.to_ir()
-        print(ir)
 
         # Concrete boolean conditionals (False/True) should be removed from IR
         # So we skip past them and go directly to the first non-concrete conditional
@@ -255,7 +321,7 @@ class TestMakeDecisionHierarchically:
 
     def test_medium_score_metric3_high(self):
         # Case: Medium score, safe, metric3 high
-        u = User(metric1=0.5, metric2=0.5, metric3=6)
+        u = USERS["medium_weighted_score"]
         result = TestMakeDecisionHierarchically.traced_make_decision_hierarchically(u)
         assert result is self.make_decision_hierarchically(u)
 
@@ -301,10 +367,14 @@ class TestConcreteBooleanConditions:
                 return True
             return False
 
-        u = User(metric1=0.5, metric2=0.5, metric3=6)
+        u = USERS["medium_weighted_score"]
         result = func_with_false_condition(u)
         assert result is False
 
+        # The branch is pruned when the function is compiled, so it's never
+        # recorded in the first place.
+        assert all(e.op != "branch" for e in func_with_false_condition.trace.events)
+
         ir = func_with_false_condition.trace.to_ir()
         # The conditional with False should be removed, so we should just have a Return
         assert isinstance(ir, tracer.Return)
@@ -320,10 +390,14 @@ class TestConcreteBooleanConditions:
                 return user.metric3 > 5
             return False
 
-        u = User(metric1=0.5, metric2=0.5, metric3=6)
+        u = USERS["medium_weighted_score"]
         result = func_with_true_condition(u)
         assert result is True
 
+        # The branch is pruned when the function is compiled, so it's never
+        # recorded in the first place.
+        assert all(e.op != "branch" for e in func_with_true_condition.trace.events)
+
         ir = func_with_true_condition.trace.to_ir()
         # The conditional with True should be removed, so we should just have a Return
         assert isinstance(ir, tracer.Return)
@@ -339,7 +413,7 @@ class TestConcreteBooleanConditions:
                 return True
             return False
 
-        u = User(metric1=0.5, metric2=0.5, metric3=6)
+        u = USERS["medium_weighted_score"]
         result = func_with_expression_condition(u)
         assert result is True
 
@@ -351,40 +425,91 @@ class TestConcreteBooleanConditions:
         assert isinstance(ir.value, tracer.Return)
 
 
+@njit("float64(float64, int64)", cache=True)
+def _calculate_risk_score(blood_pressure: float, heart_rate: int) -> float:
+    """Calculate a risk score based on blood pressure and heart rate."""
+    pressure_factor = blood_pressure / 100.0
+    rate_factor = float(heart_rate) / 80.0
+    return pressure_factor * rate_factor
+
+
+@njit("boolean(float64)", cache=True)
+def _is_critical_temperature(temperature: float) -> bool:
+    """Check if temperature indicates a critical condition."""
+    return temperature > 37.5
+
+
+@njit("boolean(float64)", cache=True)
+def _is_high_risk(risk_score: float) -> bool:
+    return risk_score > 1.5
+
+
+@njit("boolean(int64)", cache=True)
+def _is_tachycardic(heart_rate: int) -> bool:
+    return heart_rate > 100
+
+
+@numba.vectorize(cache=True)
+def _assess_patient_values(
+    blood_pressure: float, heart_rate: int, temperature: float
+) -> bool:
+    """The rule of assess_patient for one patient, from the same helpers."""
+    return (
+        _is_high_risk(_calculate_risk_score(blood_pressure, heart_rate))
+        and _is_tachycardic(heart_rate)
+        and _is_critical_temperature(temperature)
+    )
+
+
 class TestAssessPatient:
     class Patient(NamedTuple):
         blood_pressure: float
         heart_rate: int
         temperature: float
 
-    @staticmethod
-    @njit
-    def calculate_risk_score(blood_pressure: float, heart_rate: int) -> float:
-        """Calculate a risk score based on blood pressure and heart rate."""
-        pressure_factor = blood_pressure / 100.0
-        rate_factor = float(heart_rate) / 80.0
-        return pressure_factor * rate_factor
+    class PatientBatch(NamedTuple):
+        """Patients stored column-wise, to assess many of them at once.
 
-    @staticmethod
-    @njit
-    def is_critical_temperature(temperature: float) -> bool:
-        """Check if temperature indicates a critical condition."""
-        return temperature > 37.5
+        The columns use the narrowest types that hold their values. A bulk
+        scan reads half the bytes of float64 for the float32 columns, and a
+        quarter of those of int64 for the uint16 heart rates.
+        """
+
+        blood_pressure: np.ndarray
+        heart_rate: np.ndarray
+        temperature: np.ndarray
+
+    CRITICAL_PATIENT = Patient(blood_pressure=130.0, heart_rate=110, temperature=38.0)
+
+    calculate_risk_score = staticmethod(_calculate_risk_score)
+    is_high_risk = staticmethod(_is_high_risk)
+    is_tachycardic = staticmethod(_is_tachycardic)
+    is_critical_temperature = staticmethod(_is_critical_temperature)
 
     @staticmethod
     @tracer.trace
     def assess_patient(patient: tracer.Traceable[Patient]) -> bool:
-        bp, hr, temp = patient.blood_pressure, patient.heart_rate, patient.temperature
-        risk_score = TestAssessPatient.calculate_risk_score(bp, hr)
-
-        if risk_score > 1.5:
-            if hr > 100:
-                return TestAssessPatient.is_critical_temperature(temp)
+        # Read the fields where they're used. Unpacking them into locals first
+        # would add an assignment to every trace.
+        risk_score = TestAssessPatient.calculate_risk_score(
+            patient.blood_pressure, patient.heart_rate
+        )
+
+        if TestAssessPatient.is_high_risk(risk_score):
+            if TestAssessPatient.is_tachycardic(patient.heart_rate):
+                return TestAssessPatient.is_critical_temperature(patient.temperature)
         return False
 
+    @staticmethod
+    def assess_patient_batch(batch: PatientBatch) -> np.ndarray:
+        """The untraced assess_patient, vectorized over a batch of patients."""
+        return _assess_patient_values(
+            batch.blood_pressure, batch.heart_rate, batch.temperature
+        )
+
     def test_assess_patient_case_1(self):
         """Test the example from README with critical patient"""
-        patient = self.Patient(blood_pressure=130.0, heart_rate=110, temperature=38.0)
+        patient = self.CRITICAL_PATIENT
         result = TestAssessPatient.assess_patient(patient)
 
         # Verify correctness
@@ -396,10 +521,35 @@ class TestAssessPatient:
 
         # Verify trace structure
         ir = TestAssessPatient.assess_patient.trace.to_ir()
-        print("Trace IR:", ir)
 
         # The trace should show the conditional logic
         assert isinstance(ir, tracer.Conditional)
+        expected_str = """if (((blood_pressure / 100.0000) * (float(heart_rate) / 80.0000)) > 1.5000) (=True):
+  if (heart_rate > 100) (=True):
+    return (temperature > 37.5000)"""
+        assert str(ir) == expected_str
+
+    def test_assess_patient_batch(self):
+        Patient = TestAssessPatient.Patient
+        patients = [
+            self.CRITICAL_PATIENT,
+            Patient(blood_pressure=120.0, heart_rate=90, temperature=38.0),
+            Patient(blood_pressure=160.0, heart_rate=105, temperature=37.0),
+            Patient(blood_pressure=140.0, heart_rate=120, temperature=39.0),
+            Patient(blood_pressure=200.0, heart_rate=95, temperature=38.0),
+        ]
+        dtypes = (np.float32, np.uint16, np.float32)
+        batch = TestAssessPatient.PatientBatch(
+            *(
+                np.array(column, dtype=dtype)
+                for column, dtype in zip(zip(*patients), dtypes)
+            )
+        )
+
+        result = TestAssessPatient.assess_patient_batch(batch)
+        assert len(result) == len(patients)
+        for patient, assessment in zip(patients, result):
+            assert assessment == TestAssessPatient.assess_patient(patient), patient
 
 
 class TestDiamondPruning:
@@ -423,6 +573,118 @@ class TestDiamondPruning:
         assert ir.expression.text == "3"
 
 
+class TestRedecoration:
+    def test_redecorating_reuses_compilation(self):
+        def decide(user: tracer.Traceable[User]) -> bool:
+            return user.metric3 > 5
+
+        u = USERS["high_metrics"]
+        first = tracer.trace(decide)
+        assert first(u) is True
+
+        # The second decoration finds the function already compiled.
+        assert tracer._traced_dispatcher(decide).signatures
+        second = tracer.trace(decide)
+        assert second(u) is True
+        assert str(second.trace.to_ir()) == str(first.trace.to_ir())
+
+
+class TestNameTables:
+    def test_functions_intern_their_own_names(self):
+        def above(user: tracer.Traceable[User]) -> bool:
+            return user.metric3 > 5
+
+        def below(user: tracer.Traceable[User]) -> bool:
+            return user.metric1 < 0.5
+
+        tracer.trace(above)(USERS["high_metrics"])
+        tracer.trace(below)(USERS["high_metrics"])
+
+        assert "metric3" in tracer._name_table(above).names
+        assert "metric3" not in tracer._name_table(below).names
+
+
+class TestThreadedTracing:
+    def test_threads_record_their_own_traces(self):
+        @tracer.trace
+        def decide(user: tracer.Traceable[User]) -> bool:
+            return user.metric3 > 5
+
+        def trace_repeatedly(user: User) -> List[bool]:
+            values = []
+            for _ in range(200):
+                decide(user)
+                # Let the other thread call decide before reading the trace.
+                time.sleep(0)
+                values.append(decide.trace.to_ir().expression.value)
+            return values
+
+        users = [USERS["high_metrics"], USERS["low_metric3"]]
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            high, low = pool.map(trace_repeatedly, users)
+
+        assert high == [True] * 200
+        assert low == [False] * 200
+
+
+class TestTracedFunction:
+    def test_wraps_function(self):
+        def decide(user: tracer.Traceable[User]) -> bool:
+            """Decides."""
+            return user.metric3 > 5
+
+        traced = tracer.trace(decide)
+        assert traced.__name__ == "decide"
+        assert traced.__doc__ == "Decides."
+        assert traced.__wrapped__ is decide
+
+    def test_binds_methods(self):
+        class Threshold(NamedTuple):
+            low: float
+
+            @tracer.trace
+            def exceeded_by(self, x: tracer.Traceable[float]) -> bool:
+                return x > self.low
+
+        threshold = Threshold(0.5)
+        assert threshold.exceeded_by(1.0) is True
+        assert threshold.exceeded_by.trace.pretty_print() == "return (x > low)"
+
+
+class TestTracerDisable:
+    def test_disabled_wraps_function(self, monkeypatch):
+        monkeypatch.setenv("TRACER_DISABLE", "1")
+
+        def decide(user: tracer.Traceable[User]) -> bool:
+            return user.metric3 > 5
+
+        untraced = tracer.trace(decide)
+        assert untraced(USERS["high_metrics"]) is True
+        assert untraced.__wrapped__ is decide
+        assert not hasattr(decide, "trace")
+        with pytest.raises(RuntimeError):
+            untraced.trace.to_ir()
+
+    def test_disabled_wraps_bound_method(self, monkeypatch):
+        monkeypatch.setenv("TRACER_DISABLE", "1")
+
+        # Bound methods don't take new attributes.
+        untraced = tracer.trace(USERS["high_metrics"].count)
+        assert untraced(6) == 1
+        with pytest.raises(RuntimeError):
+            untraced.trace.to_ir()
+
+    def test_force_overrides_disable(self, monkeypatch):
+        monkeypatch.setenv("TRACER_DISABLE", "1")
+
+        @tracer.trace(force=True)
+        def decide(user: tracer.Traceable[User]) -> bool:
+            return user.metric3 > 5
+
+        assert decide(USERS["high_metrics"]) is True
+        assert str(decide.trace.to_ir()) == "return (metric3 > 5)"
+
+
 class TestGetTraceableArgs:
     def test_get_traceable_args_basic(self):
         def func(a: tracer.Traceable[int], b: int, c: tracer.Traceable[float]):
@@ -1,16 +1,33 @@
-from typing import NamedTuple, Any, List, Tuple, Callable, TypeVar, Generic, Dict
+from typing import (
+    NamedTuple,
+    Any,
+    List,
+    Tuple,
+    Callable,
+    TypeVar,
+    Generic,
+    Dict,
+)
 import typing
 import inspect
+import functools
+import itertools
+import operator
+import os
+import threading
+import types
+import weakref
 from dataclasses import dataclass
 import numba
+from numba import literal_unroll
 from numba.core import ir
 from numba.core.compiler import CompilerBase, DefaultPassBuilder
 from numba.core.compiler_machinery import FunctionPass, register_pass
-from numba.core import ir_utils
+from numba.extending import overload
 import numba.core.untyped_passes
 
-import diamond_pruning_pass
-import inlining
+import dead_code_elimination_pass
+import inline_and_prune_pass
 
 
 T = TypeVar("T")
@@ -20,6 +37,23 @@ class Traceable(Generic[T]):
     pass
 
 
+@numba.njit
+def all_(*conds: bool) -> bool:
+    """Returns the conjunction of ``conds``, without short-circuiting.
+
+    ``a and b and c`` compiles to a chain of branches, one per operand, and a
+    trace records each as its own Conditional. Traced functions call this
+    instead, which ConjunctionFusionPass replaces with ``a & b & c``, so the
+    whole conjunction is evaluated and traced as a single expression.
+    """
+    result = True
+    # literal_unroll lets the conditions have different types, like a
+    # comparison and an int. Numba only recognises it when imported by name.
+    for cond in literal_unroll(conds):
+        result = result & cond
+    return result
+
+
 class TraceEvent(NamedTuple):
     op: str
     output_var: str
@@ -29,10 +63,15 @@ class TraceEvent(NamedTuple):
 
 
 class TracingIRNode:
-    pass
+    # Traces can hold many nodes, so none of them carry a __dict__.
+    __slots__ = ()
+
+    def _format_lines(self, lines: List[str], indent: str) -> None:
+        """Appends the lines of ``str(self)``, indented by ``indent``."""
+        lines.extend(indent + line for line in str(self).splitlines())
 
 
-@dataclass
+@dataclass(slots=True)
 class Expression(TracingIRNode):
     text: str
     value: Any = None
@@ -41,7 +80,7 @@ class Expression(TracingIRNode):
         return self.text
 
 
-@dataclass
+@dataclass(slots=True)
 class Return(TracingIRNode):
     expression: Expression
 
@@ -49,157 +88,426 @@ class Return(TracingIRNode):
         return f"return {self.expression.text}"
 
 
-@dataclass
+@dataclass(slots=True)
 class Conditional(TracingIRNode):
     condition: Expression
     value: Return | "Conditional"
 
     def __str__(self) -> str:
-        cond_val_str = (
-            f" (={self.condition.value})" if self.condition.value is not None else ""
-        )
-        parts = [f"if {self.condition.text}{cond_val_str}:"]
-        if self.value:
-            for line in str(self.value).splitlines():
-                parts.append(f"  {line}")
-        return "\n".join(parts)
+        # Format the whole chain into one list of lines and join it once.
+        # Reindenting the string of each nested node instead would copy the
+        # deepest lines once per level.
+        lines: List[str] = []
+        self._format_lines(lines, "")
+        return "\n".join(lines)
+
+    def _format_lines(self, lines: List[str], indent: str) -> None:
+        # Walk down the chain of nested Conditionals in a loop, so deep chains
+        # don't recurse once per level.
+        node = self
+        while type(node) is Conditional:
+            condition = node.condition
+            cond_val_str = (
+                f" (={condition.value})" if condition.value is not None else ""
+            )
+            lines.append(f"{indent}if {condition.text}{cond_val_str}:")
+            indent += "  "
+            node = node.value
+        if node:
+            node._format_lines(lines, indent)
 
 
 def stringify_constant(val: Any) -> str:
     return f"{val:.4f}" if isinstance(val, float) else str(val)
 
 
+_BINARY_OPS = {
+    "add": "+",
+    "sub": "-",
+    "mul": "*",
+    "div": "/",
+    "truediv": "/",
+    "floordiv": "//",
+    "mod": "%",
+    "pow": "**",
+    "gt": ">",
+    "ge": ">=",
+    "lt": "<",
+    "le": "<=",
+    "eq": "==",
+    "ne": "!=",
+    "bitand": "&",
+    "bitor": "|",
+    "bitxor": "^",
+    # Binops are logged by the name of their operator function, and those of
+    # &, | and ^ differ from the ops' own names.
+    "and_": "&",
+    "or_": "|",
+    "xor": "^",
+    "lshift": "<<",
+    "rshift": ">>",
+}
+
+
+def _resolve(var_exprs: Dict[str, str], name: str, val: Any) -> str:
+    if name in var_exprs:
+        return var_exprs[name]
+    if name.startswith("const("):
+        # Constants are formatted once, when the function is compiled.
+        return name[len("const(") : -1]
+    if name.startswith("$const"):
+        return stringify_constant(val)
+    if name.startswith("$"):
+        return "unknown variable"
+    return name
+
+
+def _on_branch(event: TraceEvent, var_exprs: Dict[str, str]) -> Conditional | None:
+    cond_name, cond_val = event.inputs[0]
+    expr_str = _resolve(var_exprs, cond_name, cond_val)
+    # Skip creating Conditional if condition is a concrete boolean value
+    # (True/False) rather than an Expression
+    if expr_str in ("True", "False"):
+        # Skip this conditional entirely - it's a concrete value, not an expression
+        return None
+    # Create Conditional. value (body) is not yet known.
+    return Conditional(Expression(expr_str, cond_val), None)
+
+
+def _on_return(event: TraceEvent, var_exprs: Dict[str, str]) -> Return:
+    if event.inputs:
+        val_name, val_val = event.inputs[0]
+        expr_str = _resolve(var_exprs, val_name, val_val)
+    else:
+        expr_str = stringify_constant(event.output_val)
+
+    return Return(Expression(expr_str, event.output_val))
+
+
+def _on_copy(event: TraceEvent, var_exprs: Dict[str, str]) -> None:
+    if len(event.inputs) != 1:
+        _on_call(event, var_exprs)
+        return
+    in_name, in_val = event.inputs[0]
+    var_exprs[event.output_var] = _resolve(var_exprs, in_name, in_val)
+
+
+def _on_bool(event: TraceEvent, var_exprs: Dict[str, str]) -> None:
+    if event.inputs:
+        name, val = event.inputs[0]
+        var_exprs[event.output_var] = _resolve(var_exprs, name, val)
+    else:
+        var_exprs[event.output_var] = "False"
+
+
+def _on_binary_op(op_sym: str, event: TraceEvent, var_exprs: Dict[str, str]) -> None:
+    (lhs_name, lhs_val), (rhs_name, rhs_val) = event.inputs[:2]
+    var_exprs[event.output_var] = "(%s %s %s)" % (
+        _resolve(var_exprs, lhs_name, lhs_val),
+        op_sym,
+        _resolve(var_exprs, rhs_name, rhs_val),
+    )
+
+
+def _on_call(event: TraceEvent, var_exprs: Dict[str, str]) -> None:
+    args_str = ", ".join(_resolve(var_exprs, name, val) for name, val in event.inputs)
+    var_exprs[event.output_var] = "%s(%s)" % (event.op, args_str)
+
+
+# How to_ir() handles each op. Ops that aren't listed are rendered as calls.
+# A handler records the expression an event computes in the map it's passed,
+# and returns the IR node the event makes, if any.
+_EventHandler = Callable[[TraceEvent, Dict[str, str]], Return | Conditional | None]
+_EVENT_HANDLERS: Dict[str, _EventHandler] = {
+    **{
+        op: functools.partial(_on_binary_op, op_sym)
+        for op, op_sym in _BINARY_OPS.items()
+    },
+    "branch": _on_branch,
+    "return": _on_return,
+    "cast": _on_copy,
+    "assign": _on_copy,
+    "bool": _on_bool,
+}
+
+
 class Trace:
     def __init__(self, events: List[TraceEvent]) -> None:
         self.events = events
 
     def to_ir(self) -> Return | Conditional | None:
-        var_exprs = {}
-        BINARY_OPS = {
-            "add": "+",
-            "sub": "-",
-            "mul": "*",
-            "div": "/",
-            "truediv": "/",
-            "floordiv": "//",
-            "mod": "%",
-            "pow": "**",
-            "gt": ">",
-            "ge": ">=",
-            "lt": "<",
-            "le": "<=",
-            "eq": "==",
-            "ne": "!=",
-            "bitand": "&",
-            "bitor": "|",
-            "bitxor": "^",
-            "lshift": "<<",
-            "rshift": ">>",
-        }
-
-        def resolve(name: str, val: Any) -> str:
-            if name in var_exprs:
-                return var_exprs[name]
-            if name.startswith("$const") or name.startswith("const("):
-                return stringify_constant(val)
-            if name.startswith("$") and not name.startswith("$const"):
-                return "unknown variable"
-            return name
-
-        nodes = []
+        var_exprs: Dict[str, str] = {}
 
+        # Link each node to the previous Conditional as it's made.
+        root = parent = None
+        handlers = _EVENT_HANDLERS
         for event in self.events:
-            if event.op == "branch":
-                cond_name, cond_val = event.inputs[0]
-                expr_str = resolve(cond_name, cond_val)
-                # Skip creating Conditional if condition is a concrete boolean value
-                # (True/False) rather than an Expression
-                if expr_str in ("True", "False"):
-                    # Skip this conditional entirely - it's a concrete value, not an expression
-                    continue
-                # Create Conditional. value (body) is not yet known.
-                nodes.append(Conditional(Expression(expr_str, cond_val), None))
-
-            elif event.op == "return":
-                if event.inputs:
-                    val_name, val_val = event.inputs[0]
-                    expr_str = resolve(val_name, val_val)
-                else:
-                    expr_str = stringify_constant(event.output_val)
-
-                nodes.append(Return(Expression(expr_str, event.output_val)))
-
-            elif event.op in ("cast", "assign") and len(event.inputs) == 1:
-                in_name, in_val = event.inputs[0]
-                var_exprs[event.output_var] = resolve(in_name, in_val)
-
-            elif event.op in BINARY_OPS:
-                lhs_name, lhs_val = event.inputs[0]
-                rhs_name, rhs_val = event.inputs[1]
-                lhs_expr = resolve(lhs_name, lhs_val)
-                rhs_expr = resolve(rhs_name, rhs_val)
-                op_sym = BINARY_OPS[event.op]
-                var_exprs[event.output_var] = f"({lhs_expr} {op_sym} {rhs_expr})"
-
-            elif event.op == "bool":
-                if event.inputs:
-                    name, val = event.inputs[0]
-                    var_exprs[event.output_var] = resolve(name, val)
-                else:
-                    var_exprs[event.output_var] = "False"
+            node = handlers.get(event.op, _on_call)(event, var_exprs)
+            if node is None:
+                continue
 
+            if parent is None:
+                root = node
             else:
-                args_str = ", ".join(resolve(name, val) for name, val in event.inputs)
-                var_exprs[event.output_var] = f"{event.op}({args_str})"
+                parent.value = node
+
+            # Nothing follows a return.
+            if type(node) is Return:
+                break
+            parent = node
+
+        return root
+
+    def pretty_print(self) -> str:
+        return str(self.to_ir())
 
-        # Link nodes
-        if not nodes:
-            return None
 
-        for i in range(len(nodes) - 2, -1, -1):
-            if isinstance(nodes[i], Conditional):
-                nodes[i].value = nodes[i + 1]
+class _DisabledTrace:
+    """The trace of a function whose tracing was disabled by TRACER_DISABLE."""
 
-        return nodes[0]
+    def to_ir(self) -> Return | Conditional | None:
+        raise RuntimeError("Tracing is disabled by the TRACER_DISABLE variable")
 
     def pretty_print(self) -> str:
         return str(self.to_ir())
 
 
-# Global context for the current trace
-_CURRENT_TRACE: List[TraceEvent] = []
-_TRACEABLE_VARS: set = set()
+class _TraceState(threading.local):
+    """The context of the traced call running on each thread.
 
+    Traced functions are compiled with ``nogil``, so several threads can run
+    them at once, each recording into its own state.
+    """
 
-@numba.njit
-def _log_trace_tuple(record: Tuple[str, str, Any, str, Any, str, Any, int]) -> None:
+    def __init__(self) -> None:
+        # The raw records the running traced function logs, which become
+        # TraceEvents once it returns.
+        self.records: List[Tuple[int, int, Any, int, Any, int, Any, int]] = []
+        self.traceable_vars: set = set()
+
+
+_TRACE_STATE = _TraceState()
+
+
+def _store_record(record: Tuple[int, int, Any, int, Any, int, Any, int]) -> None:
+    # _append_trace_record calls this rather than reaching into _TRACE_STATE
+    # itself: Numba won't cache its object mode code if it does.
+    _TRACE_STATE.records.append(record)
+
+
+class _NameTable:
+    """The op and variable names of a traced function, numbered.
+
+    Names are interned when the tracing code is injected, so a traced function
+    logs small ints instead of boxing a string per name and per event.
+    """
+
+    __slots__ = ("names", "ids")
+
+    def __init__(self) -> None:
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+
+    def intern(self, name: str) -> int:
+        if name not in self.ids:
+            self.ids[name] = len(self.names)
+            self.names.append(name)
+        return self.ids[name]
+
+
+# Names only repeat within a function, so each traced function has its own
+# table, which lives as long as the function does.
+_NAME_TABLES: weakref.WeakKeyDictionary[Callable[..., Any], _NameTable] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _name_table(func: Callable[..., Any]) -> _NameTable:
+    return _NAME_TABLES.setdefault(func, _NameTable())
+
+
+@numba.njit(cache=True)
+def _append_trace_record(
+    op_id: int,
+    out_id: int,
+    out_val: Any,
+    in1_id: int,
+    in1_val: Any,
+    in2_id: int,
+    in2_val: Any,
+    lineno: int,
+) -> None:
+    # Do as little as possible in object mode: the record is decoded after
+    # the traced function returns.
     with numba.objmode():
-        op_name, out_name, out_val, in1_name, in1_val, in2_name, in2_val, lineno = (
-            record
+        _store_record(
+            (op_id, out_id, out_val, in1_id, in1_val, in2_id, in2_val, lineno)
         )
+
+
+def _log_trace_tuple(
+    op_id: int,
+    out_id: int,
+    out_val: Any,
+    in1_id: int,
+    in1_val: Any,
+    in2_id: int,
+    in2_val: Any,
+    lineno: int,
+) -> None:
+    """Logs an event of a traced function.
+
+    Its implementation is the overload below, so it's only callable from
+    traced code.
+    """
+    raise TypeError("_log_trace_tuple is only callable from traced code")
+
+
+# Numba rejects an implementation whose parameters are annotated differently
+# from its typing function, so neither is annotated.
+@overload(_log_trace_tuple)
+def _log_trace_tuple_overload(
+    op_id, out_id, out_val, in1_id, in1_val, in2_id, in2_val, lineno
+):
+    # The tracing pass passes the name ids and line numbers as constants,
+    # which Numba types literally. Typing an overload tries the arguments'
+    # plain types first, so the cached _append_trace_record is specialized
+    # on the types of the logged values only, rather than once per call site.
+    def impl(op_id, out_id, out_val, in1_id, in1_val, in2_id, in2_val, lineno):
+        _append_trace_record(
+            op_id, out_id, out_val, in1_id, in1_val, in2_id, in2_val, lineno
+        )
+
+    return impl
+
+
+def _events_from_records(
+    records: List[Tuple[int, int, Any, int, Any, int, Any, int]],
+    names: List[str],
+) -> List[TraceEvent]:
+    """Decodes the records logged by ``_log_trace_tuple`` into TraceEvents.
+
+    ``names`` is the name table of the function that logged them.
+    """
+    traceable_vars = _TRACE_STATE.traceable_vars
+    events = []
+    for op_id, out_id, out_val, in1_id, in1_val, in2_id, in2_val, lineno in records:
+        out_name = names[out_id]
+        in1_name = names[in1_id]
+        in2_name = names[in2_id]
+
         inputs = []
         if in1_name:
-            val_name = in1_name
-            if in1_name in _TRACEABLE_VARS:
-                pass
-            inputs.append((val_name, in1_val))
+            inputs.append((in1_name, in1_val))
         if in2_name:
-            val_name = in2_name
-            if in2_name in _TRACEABLE_VARS:
-                pass
-            inputs.append((val_name, in2_val))
+            inputs.append((in2_name, in2_val))
 
         # Propagate traceability
-        is_traceable = False
-        if in1_name and in1_name in _TRACEABLE_VARS:
-            is_traceable = True
-        if in2_name and in2_name in _TRACEABLE_VARS:
-            is_traceable = True
+        if (in1_name and in1_name in traceable_vars) or (
+            in2_name and in2_name in traceable_vars
+        ):
+            traceable_vars.add(out_name)
+
+        events.append(TraceEvent(names[op_id], out_name, out_val, inputs, lineno))
+    return events
 
-        if is_traceable:
-            _TRACEABLE_VARS.add(out_name)
 
-        _CURRENT_TRACE.append(TraceEvent(op_name, out_name, out_val, inputs, lineno))
+# Expression ops that aren't logged. Uses of a getattr's result are named after
+# the attribute by resolve_name, so to_ir never looks the result itself up, and
+# logging it would box the whole object it was read from.
+_UNTRACED_EXPR_OPS = frozenset({"getattr"})
+
+
+def _stmt_kind(stmt: Any) -> Tuple[type, Any]:
+    """Returns the key of ``stmt`` in TracingInjectionPass's handler table.
+
+    That's the type of an assignment's expression, or its op for binops and
+    casts, alongside the statement's type.
+    """
+    stmt_type = type(stmt)
+    if stmt_type is not ir.Assign:
+        return stmt_type, None
+    value_type = type(stmt.value)
+    if value_type is ir.Expr and stmt.value.op in ("binop", "inplace_binop", "cast"):
+        return stmt_type, stmt.value.op
+    return stmt_type, value_type
+
+
+@register_pass(mutates_CFG=False, analysis_only=False)
+class ConjunctionFusionPass(FunctionPass):
+    """Replaces calls to ``all_`` with the chain of ``&`` they compute.
+
+    The inliner leaves these calls alone because ``all_`` takes star args, so
+    this runs after it, and also fuses the calls of inlined helpers. Calls
+    with star args or keyword arguments are left to Numba to compile.
+    """
+
+    _name = "conjunction_fusion_pass"
+
+    def __init__(self) -> None:
+        FunctionPass.__init__(self)
+
+    def run_pass(self, state: Any) -> bool:
+        func_ir = state.func_ir
+        changed = False
+        for block in func_ir.blocks.values():
+            new_body = []
+            for stmt in block.body:
+                if _is_fusable_all_call(func_ir, stmt):
+                    new_body.extend(_fuse_conjunction(block.scope, stmt))
+                    changed = True
+                else:
+                    new_body.append(stmt)
+            block.body = new_body
+        return changed
+
+
+def _is_fusable_all_call(func_ir: Any, stmt: Any) -> bool:
+    """Returns whether ``stmt`` assigns a call to ``all_`` that can be fused."""
+    if not (
+        type(stmt) is ir.Assign
+        and type(stmt.value) is ir.Expr
+        and stmt.value.op == "call"
+        and not (stmt.value.vararg or stmt.value.kws)
+    ):
+        return False
+
+    try:
+        func_def = func_ir.get_definition(stmt.value.func)
+        if isinstance(func_def, ir.Expr) and func_def.op == "getattr":
+            # Calls like tracer.all_(...).
+            obj_def = func_ir.get_definition(func_def.value)
+            if not isinstance(obj_def, (ir.Global, ir.FreeVar)):
+                return False
+            return getattr(obj_def.value, func_def.attr, None) is all_
+    except KeyError:
+        return False
+    return isinstance(func_def, (ir.Global, ir.FreeVar)) and func_def.value is all_
+
+
+def _fuse_conjunction(scope: Any, call: ir.Assign) -> List[ir.Assign]:
+    """Returns the statements that compute the call to ``all_`` in ``call``."""
+    expr = call.value
+    loc = expr.loc
+    stmts = []
+    args = list(expr.args)
+    if len(args) <= 1:
+        # The conjunction of nothing is True, and that of a single non-bool
+        # is True & a rather than a.
+        true_var = scope.redefine("$all_", loc)
+        stmts.append(ir.Assign(ir.Const(True, loc), true_var, loc))
+        args.insert(0, true_var)
+
+    acc = args[0]
+    for arg in args[1:]:
+        target = scope.redefine("$all_", loc)
+        stmts.append(
+            ir.Assign(ir.Expr.binop(operator.and_, acc, arg, loc), target, loc)
+        )
+        acc = target
+
+    stmts.append(ir.Assign(acc, call.target, loc))
+    return stmts
 
 
 @register_pass(mutates_CFG=True, analysis_only=False)
@@ -214,6 +522,8 @@ class TracingInjectionPass(FunctionPass):
 
     def __init__(self) -> None:
         FunctionPass.__init__(self)
+        # Numbers the variables the pass introduces, so their names are unique.
+        self._counter = itertools.count()
 
     def run_pass(self, state: Any) -> bool:
         func_ir = state.func_ir
@@ -225,181 +535,64 @@ class TracingInjectionPass(FunctionPass):
         # anonymous temporary variables, and we'll have to undo those
         # assignments.
         definitions = {}
+        redefined = set()
         for block in func_ir.blocks.values():
             for stmt in block.body:
                 if isinstance(stmt, ir.Assign):
+                    if stmt.target.name in definitions:
+                        redefined.add(stmt.target.name)
                     definitions[stmt.target.name] = stmt.value
 
+        def definition_of(var: Any) -> Any:
+            """Follows ``var``'s copies to its unique definition, or None.
+
+            Does what ir_utils.get_definition does, from the map above, so that
+            instrumenting a call doesn't rescan the IR.
+            """
+            seen = set()
+            while isinstance(var, ir.Var):
+                if var.name in redefined or var.name in seen:
+                    return None
+                seen.add(var.name)
+                var = definitions.get(var.name)
+            return var
+
+        # Variables holding an attribute are named after it in the trace.
+        # Variables feed many statements, so they're looked up once here.
+        attr_names = {
+            name: defn.attr
+            for name, defn in definitions.items()
+            if isinstance(defn, ir.Expr) and defn.op == "getattr"
+        }
+
         def resolve_name(var: Any) -> str:
-            if isinstance(var, ir.Var) and var.name in definitions:
-                defn = definitions[var.name]
-                if isinstance(defn, ir.Expr) and defn.op == "getattr":
-                    return defn.attr
+            if isinstance(var, ir.Var):
+                return attr_names.get(var.name, var.name)
             return getattr(var, "name", str(var))
 
+        handlers = self._STMT_HANDLERS
+        names = _name_table(func_ir.func_id.func)
         for block in func_ir.blocks.values():
             new_body = []
+            # '$log_trace_tuple' is assigned in the entry block and available
+            # in every block by dominance. The logging calls in a block share
+            # one reference to it, and one variable per constant they log.
+            log_func = ir.Var(block.scope, "$log_trace_tuple", block.loc)
+            block_consts: Dict[Tuple[type, Any], ir.Var] = {}
+            inject = functools.partial(
+                self._inject_log, names, new_body, log_func, block_consts
+            )
             for stmt in block.body:
-                # BinOp (Arithmetic)
-                if (
-                    isinstance(stmt, ir.Assign)
-                    and isinstance(stmt.value, ir.Expr)
-                    and stmt.value.op == "binop"
-                ):
-                    new_body.append(stmt)
-                    self._inject_log(
-                        new_body,
-                        stmt.loc,
-                        stmt.value.fn,
-                        stmt.target,
-                        stmt.target,
-                        resolve_name(stmt.value.lhs),
-                        stmt.value.lhs,
-                        resolve_name(stmt.value.rhs),
-                        stmt.value.rhs,
-                    )
-
-                # InplaceBinOp
-                elif (
-                    isinstance(stmt, ir.Assign)
-                    and isinstance(stmt.value, ir.Expr)
-                    and stmt.value.op == "inplace_binop"
-                ):
+                handler = handlers.get(_stmt_kind(stmt))
+                if handler is None:
                     new_body.append(stmt)
-                    self._inject_log(
-                        new_body,
-                        stmt.loc,
-                        stmt.value.fn,
-                        stmt.target,
-                        stmt.target,
-                        resolve_name(stmt.value.lhs),
-                        stmt.value.lhs,
-                        resolve_name(stmt.value.rhs),
-                        stmt.value.rhs,
-                    )
-
-                # Cast
-                elif (
-                    isinstance(stmt, ir.Assign)
-                    and isinstance(stmt.value, ir.Expr)
-                    and stmt.value.op == "cast"
-                ):
-                    new_body.append(stmt)
-                    self._inject_log(
-                        new_body,
-                        stmt.loc,
-                        "cast",
-                        stmt.target,
-                        stmt.target,
-                        resolve_name(stmt.value.value),
-                        stmt.value.value,
-                        "",
-                        None,
-                    )
-
-                # Simple Assignment (Var or Const)
-                elif isinstance(stmt, ir.Assign) and (
-                    isinstance(stmt.value, ir.Var) or isinstance(stmt.value, ir.Const)
-                ):
-                    new_body.append(stmt)
-
-                    val_to_log = stmt.value
-                    if isinstance(stmt.value, ir.Const):
-                        val_to_log = stmt.value.value
-
-                    self._inject_log(
-                        new_body,
-                        stmt.loc,
-                        "assign",
-                        stmt.target,
-                        stmt.target,
-                        resolve_name(stmt.value),
-                        val_to_log,
-                        "",
-                        None,
-                    )
-
-                # Branch
-                elif isinstance(stmt, ir.Branch):
-                    self._inject_log(
-                        new_body,
-                        stmt.loc,
-                        "branch",
-                        resolve_name(stmt.cond),
-                        stmt.cond,
-                        resolve_name(stmt.cond),
-                        stmt.cond,
-                        "",
-                        None,
-                    )
-                    new_body.append(stmt)
-
-                # Return
-                elif isinstance(stmt, ir.Return):
-                    self._inject_log(
-                        new_body,
-                        stmt.loc,
-                        "return",
-                        "return_val",
-                        stmt.value,
-                        resolve_name(stmt.value),
-                        stmt.value,
-                        "",
-                        None,
-                    )
-                    new_body.append(stmt)
-
-                # Generic Expr Assignment
-                elif isinstance(stmt, ir.Assign) and isinstance(stmt.value, ir.Expr):
-                    new_body.append(stmt)
-
-                    op = stmt.value.op
-                    op_to_log = op
-                    in1_name = ""
-                    in1_val = None
-
-                    if op == "call":
-                        # Try to resolve function name
-                        func_var = stmt.value.func
-                        func_def = ir_utils.get_definition(func_ir, func_var)
-                        if isinstance(func_def, (ir.Global, ir.FreeVar)):
-                            func_obj = getattr(func_def, "value", None)
-                            if func_obj:
-                                if hasattr(func_obj, "__name__"):
-                                    op_to_log = func_obj.__name__
-                                else:
-                                    op_to_log = str(func_obj)
-
-                    if op == "call" and stmt.value.args:
-                        in1_name = resolve_name(stmt.value.args[0])
-                        in1_val = stmt.value.args[0]
-                    else:
-                        try:
-                            val = stmt.value.value
-                            in1_name = resolve_name(val)
-                            in1_val = val
-                        except (KeyError, AttributeError):
-                            pass
-
-                    self._inject_log(
-                        new_body,
-                        stmt.loc,
-                        op_to_log,
-                        stmt.target,
-                        stmt.target,
-                        in1_name,
-                        in1_val,
-                        "",
-                        None,
-                    )
-
                 else:
-                    new_body.append(stmt)
+                    handler(self, stmt, new_body, inject, resolve_name, definition_of)
 
             block.body = new_body
 
         # Insert global definition at entry block
-        first_label = min(func_ir.blocks.keys())
+        first_label = min(func_ir.blocks)
         entry_block = func_ir.blocks[first_label]
         scope = entry_block.scope
         loc = entry_block.loc
@@ -412,9 +605,189 @@ class TracingInjectionPass(FunctionPass):
 
         return True
 
+    def _handle_binop(
+        self,
+        stmt: ir.Assign,
+        new_body: List[Any],
+        inject: Callable[..., None],
+        resolve_name: Callable[[Any], str],
+        definition_of: Callable[[Any], Any],
+    ) -> None:
+        """Handles binops and inplace binops (arithmetic and comparisons)."""
+        new_body.append(stmt)
+        inject(
+            stmt.loc,
+            stmt.value.fn,
+            stmt.target,
+            stmt.target,
+            resolve_name(stmt.value.lhs),
+            stmt.value.lhs,
+            resolve_name(stmt.value.rhs),
+            stmt.value.rhs,
+        )
+
+    def _handle_cast(
+        self,
+        stmt: ir.Assign,
+        new_body: List[Any],
+        inject: Callable[..., None],
+        resolve_name: Callable[[Any], str],
+        definition_of: Callable[[Any], Any],
+    ) -> None:
+        new_body.append(stmt)
+        inject(
+            stmt.loc,
+            "cast",
+            stmt.target,
+            stmt.target,
+            resolve_name(stmt.value.value),
+            stmt.value.value,
+            "",
+            None,
+        )
+
+    def _handle_assign(
+        self,
+        stmt: ir.Assign,
+        new_body: List[Any],
+        inject: Callable[..., None],
+        resolve_name: Callable[[Any], str],
+        definition_of: Callable[[Any], Any],
+    ) -> None:
+        """Handles simple assignments, of a Var or a Const."""
+        new_body.append(stmt)
+
+        val_to_log = stmt.value
+        name_to_log = resolve_name(stmt.value)
+        if isinstance(stmt.value, ir.Const):
+            val_to_log = stmt.value.value
+            # The constant's text never changes, so format it here rather
+            # than every time a trace is rendered.
+            name_to_log = f"const({stringify_constant(val_to_log)})"
+
+        inject(
+            stmt.loc,
+            "assign",
+            stmt.target,
+            stmt.target,
+            name_to_log,
+            val_to_log,
+            "",
+            None,
+        )
+
+    def _handle_branch(
+        self,
+        stmt: ir.Branch,
+        new_body: List[Any],
+        inject: Callable[..., None],
+        resolve_name: Callable[[Any], str],
+        definition_of: Callable[[Any], Any],
+    ) -> None:
+        inject(
+            stmt.loc,
+            "branch",
+            resolve_name(stmt.cond),
+            stmt.cond,
+            resolve_name(stmt.cond),
+            stmt.cond,
+            "",
+            None,
+        )
+        new_body.append(stmt)
+
+    def _handle_return(
+        self,
+        stmt: ir.Return,
+        new_body: List[Any],
+        inject: Callable[..., None],
+        resolve_name: Callable[[Any], str],
+        definition_of: Callable[[Any], Any],
+    ) -> None:
+        inject(
+            stmt.loc,
+            "return",
+            "return_val",
+            stmt.value,
+            resolve_name(stmt.value),
+            stmt.value,
+            "",
+            None,
+        )
+        new_body.append(stmt)
+
+    def _handle_expr(
+        self,
+        stmt: ir.Assign,
+        new_body: List[Any],
+        inject: Callable[..., None],
+        resolve_name: Callable[[Any], str],
+        definition_of: Callable[[Any], Any],
+    ) -> None:
+        """Handles assignments of every other kind of expression."""
+        new_body.append(stmt)
+
+        op = stmt.value.op
+        if op in _UNTRACED_EXPR_OPS:
+            return
+        op_to_log = op
+        in1_name = ""
+        in1_val = None
+
+        if op == "call":
+            # Try to resolve function name
+            func_var = stmt.value.func
+            func_def = definition_of(func_var)
+            if isinstance(func_def, (ir.Global, ir.FreeVar)):
+                func_obj = getattr(func_def, "value", None)
+                if func_obj:
+                    if hasattr(func_obj, "__name__"):
+                        op_to_log = func_obj.__name__
+                    else:
+                        op_to_log = str(func_obj)
+
+        if op == "call" and stmt.value.args:
+            in1_name = resolve_name(stmt.value.args[0])
+            in1_val = stmt.value.args[0]
+        else:
+            try:
+                val = stmt.value.value
+                in1_name = resolve_name(val)
+                in1_val = val
+            except (KeyError, AttributeError):
+                pass
+
+        inject(
+            stmt.loc,
+            op_to_log,
+            stmt.target,
+            stmt.target,
+            in1_name,
+            in1_val,
+            "",
+            None,
+        )
+
+    # Maps the kind of each statement, as computed by _stmt_kind, to the
+    # handler that instruments it. Statements of other kinds are kept as they
+    # are.
+    _STMT_HANDLERS = {
+        (ir.Assign, "binop"): _handle_binop,
+        (ir.Assign, "inplace_binop"): _handle_binop,
+        (ir.Assign, "cast"): _handle_cast,
+        (ir.Assign, ir.Var): _handle_assign,
+        (ir.Assign, ir.Const): _handle_assign,
+        (ir.Branch, None): _handle_branch,
+        (ir.Return, None): _handle_return,
+        (ir.Assign, ir.Expr): _handle_expr,
+    }
+
     def _inject_log(
         self,
+        names: _NameTable,
         body_list: List[Any],
+        log_func: ir.Var,
+        block_consts: Dict[Tuple[type, Any], ir.Var],
         loc: ir.Loc,
         op_name: Any,
         out_name: Any,
@@ -424,46 +797,51 @@ class TracingInjectionPass(FunctionPass):
         in2_name: Any,
         in2_val_var: Any,
     ) -> None:
-        # 'log_var' is available as "$log_trace_tuple" in the scope (via dominance)
-        scope = (
-            out_val_var.scope if hasattr(out_val_var, "scope") else ir.Scope(None, loc)
-        )
-        log_func = ir.Var(scope, "$log_trace_tuple", loc)
+        scope = log_func.scope
 
         def ensure_var(val: Any) -> ir.Var:
             if isinstance(val, ir.Var):
                 return val
 
-            # Handle non-string op_name (like functions)
-            if callable(val) and hasattr(val, "__name__"):
-                val = val.__name__
+            # Reuse the block's variable for this constant if it has one. The
+            # type is part of the key because 1, 1.0 and True are equal.
+            key = (type(val), val)
+            try:
+                return block_consts[key]
+            except KeyError:
+                pass
+            except TypeError:
+                key = None  # Unhashable constants get a variable per use.
 
             # Create const var
-            v = ir.Var(scope, f"$const_{id(val)}", loc)
+            v = ir.Var(scope, f"$const_{next(self._counter)}", loc)
             body_list.append(ir.Assign(ir.Const(val, loc), v, loc))
+            if key is not None:
+                block_consts[key] = v
             return v
 
+        def name_id(name: Any) -> int:
+            # Handle non-string op_name (like functions)
+            if callable(name) and hasattr(name, "__name__"):
+                name = name.__name__
+            return names.intern(name if isinstance(name, str) else str(name))
+
         args = [
-            ensure_var(op_name),
-            ensure_var(out_name if isinstance(out_name, str) else str(out_name)),
+            ensure_var(name_id(op_name)),
+            ensure_var(name_id(out_name)),
             ensure_var(out_val_var),
-            ensure_var(in1_name if isinstance(in1_name, str) else str(in1_name)),
+            ensure_var(name_id(in1_name)),
             ensure_var(in1_val_var),
-            ensure_var(in2_name if isinstance(in2_name, str) else str(in2_name)),
+            ensure_var(name_id(in2_name)),
             ensure_var(in2_val_var) if in2_val_var is not None else ensure_var(0),
             ensure_var(loc.line),
         ]
 
-        # Build tuple
-        tuple_var = ir.Var(scope, f"$tuple_{id(args)}", loc)
-        tuple_expr = ir.Expr.build_tuple(args, loc)
-        body_list.append(ir.Assign(tuple_expr, tuple_var, loc))
-
-        # Call _log_trace_tuple(tuple_var)
-        call_expr = ir.Expr.call(log_func, [tuple_var], (), loc)
+        # Call _log_trace_tuple(*args)
+        call_expr = ir.Expr.call(log_func, args, (), loc)
 
         # Dummy return var
-        dummy_var = ir.Var(scope, f"$log_ret_{loc.line}_{id(call_expr)}", loc)
+        dummy_var = ir.Var(scope, f"$log_ret_{next(self._counter)}", loc)
         body_list.append(ir.Assign(call_expr, dummy_var, loc))
 
 
@@ -471,16 +849,18 @@ class TraceCompiler(CompilerBase):
     def define_pipelines(self) -> List[Any]:
         pm = DefaultPassBuilder.define_nopython_pipeline(self.state)
         pm.add_pass_after(
-            inlining.InlineAllCallsPass, numba.core.untyped_passes.IRProcessing
+            inline_and_prune_pass.InlineAndPruneSweep,
+            numba.core.untyped_passes.IRProcessing,
         )
         pm.add_pass_after(
-            numba.core.untyped_passes.DeadBranchPrune, inlining.InlineAllCallsPass
+            ConjunctionFusionPass, inline_and_prune_pass.InlineAndPruneSweep
         )
         pm.add_pass_after(
-            diamond_pruning_pass.DiamondPruningPass,
-            numba.core.untyped_passes.DeadBranchPrune,
+            dead_code_elimination_pass.CoalescedDCEPass, ConjunctionFusionPass
+        )
+        pm.add_pass_after(
+            TracingInjectionPass, dead_code_elimination_pass.CoalescedDCEPass
         )
-        pm.add_pass_after(TracingInjectionPass, diamond_pruning_pass.DiamondPruningPass)
         pm.finalize()
         return [pm]
 
@@ -488,30 +868,109 @@ class TraceCompiler(CompilerBase):
 def get_args_to_trace(
     func: Callable[..., Any], args: Tuple[Any, ...], kwargs: Dict[str, Any]
 ) -> set[str]:
-    bound = inspect.signature(func).bind(*args, **kwargs)
-    bound.apply_defaults()
-    hints = typing.get_type_hints(func)
+    # Applying defaults binds every parameter, so which arguments are
+    # traceable only depends on func.
+    return set(_traceable_parameters(func))
 
-    return {
+
+@functools.lru_cache(maxsize=1024)
+def _traceable_parameters(func: Callable[..., Any]) -> frozenset[str]:
+    """Returns the names of ``func``'s parameters hinted ``Traceable``.
+
+    Resolving a function's signature and type hints is slow, and they don't
+    change, so they're resolved once per function rather than once per call.
+    The cache keeps up to 1024 functions alive.
+    """
+    hints = typing.get_type_hints(func)
+    return frozenset(
         name
-        for name in bound.arguments
+        for name in inspect.signature(func).parameters
         if name in hints and typing.get_origin(hints[name]) is Traceable
-    }
+    )
 
 
-def trace(func: Callable[..., Any]) -> Callable[..., Any]:
-    compiled_func = numba.njit(pipeline_class=TraceCompiler)(func)
+@functools.lru_cache(maxsize=1024)
+def _traced_dispatcher(func: Callable[..., Any]) -> Any:
+    """Returns the tracing dispatcher of ``func``.
 
-    def wrapper(*args: Any, **kwargs: Any) -> Any:
-        # TODO: don't rely on a global variable. Find a way to attach this to
-        # either the thread or to the function being traced.
-        global _CURRENT_TRACE
-        global _TRACEABLE_VARS
-        _CURRENT_TRACE = []  # Reset
-        _TRACEABLE_VARS = get_args_to_trace(func, args, kwargs)
+    Every decoration of the same function shares it, so the function is only
+    compiled once per signature. It's keyed on the function rather than its
+    bytecode because functions with the same code can differ in their globals
+    and closures. The cache keeps up to 1024 functions alive, along with
+    their compiled code.
+    """
+    return numba.njit(pipeline_class=TraceCompiler, nogil=True)(func)
 
-        res = compiled_func(*args, **kwargs)
-        wrapper.trace = Trace(list(_CURRENT_TRACE))
-        return res
 
-    return wrapper
+def trace(
+    func: Callable[..., Any] | None = None, *, force: bool = False
+) -> Callable[..., Any]:
+    """Compiles ``func`` so that each call records a trace of its execution.
+
+    The trace of the latest call on the calling thread is available as the
+    returned function's ``trace`` attribute.
+
+    ``func`` can also be an ``njit`` function, so one definition serves both
+    as a fused, compiled function for untraced calls and as the source of the
+    traced version.
+
+    Setting the TRACER_DISABLE environment variable turns this decorator into
+    a thin wrapper that calls ``func`` untraced, unless ``force`` is set. Its
+    ``trace`` then raises when it's rendered.
+    """
+    if func is None:
+        return functools.partial(trace, force=force)
+
+    if os.environ.get("TRACER_DISABLE") and not force:
+        # Wrap func rather than set its trace, since it may be shared, or may
+        # not take new attributes.
+        @functools.wraps(func)
+        def untraced(*args: Any, **kwargs: Any) -> Any:
+            return func(*args, **kwargs)
+
+        untraced.trace = _DisabledTrace()
+        return untraced
+
+    # Trace the Python source of njit functions.
+    return _TracedFunction(getattr(func, "py_func", func))
+
+
+class _TracedFunction:
+    """A function compiled by ``trace``.
+
+    Threads can share it, so the trace of its latest call is kept per thread.
+    """
+
+    def __init__(self, func: Callable[..., Any]) -> None:
+        functools.update_wrapper(self, func)
+        self._func = func
+        self._compiled_func = _traced_dispatcher(func)
+        self._names = _name_table(func)
+        self._latest = threading.local()
+
+    def __get__(self, obj: Any, objtype: Any = None) -> Any:
+        # Bind to instances like the function it wraps, for traced methods.
+        if obj is None:
+            return self
+        return types.MethodType(self, obj)
+
+    @property
+    def trace(self) -> Trace:
+        """The trace of this function's latest call on the current thread."""
+        try:
+            return self._latest.trace
+        except AttributeError:
+            raise AttributeError(
+                "The function hasn't been called on this thread yet"
+            ) from None
+
+    def __call__(self, *args: Any, **kwargs: Any) -> Any:
+        state = _TRACE_STATE
+        state.records.clear()  # Reset, reusing the buffer
+        state.traceable_vars = get_args_to_trace(self._func, args, kwargs)
+
+        res = self._compiled_func(*args, **kwargs)
+        self._latest.trace = Trace(
+            _events_from_records(state.records, self._names.names)
+        )
+        return res